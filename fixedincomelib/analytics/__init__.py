@@ -1,4 +1,5 @@
 from fixedincomelib.analytics.sabr_top_down import TimeDecayLognormalSABR
 from fixedincomelib.analytics.basics import *	
 from fixedincomelib.analytics.sabr_calculator import SABRCalculator
-from fixedincomelib.analytics.sabr_bottom_up import BottomUpLognormalSABR
\ No newline at end of file
+from fixedincomelib.analytics.sabr_bottom_up import BottomUpLognormalSABR
+from fixedincomelib.analytics.sabr_monte_carlo import SabrMonteCarlo
\ No newline at end of file
@@ -0,0 +1,144 @@
+import numpy as np
+from scipy.special import ndtr
+from fixedincomelib.analytics.sabr_kernel import shifted_lognormal_price_derivatives
+
+# Vectorized implied vol inversion and normal <-> shifted lognormal vol conversion. Conventions
+# follow pysabr.black (undiscounted premiums, shifted lognormal on k + s and f + s); all inputs
+# broadcast. Inversions run on out-of-the-money premiums, starting from a rational guess and
+# polished by safeguarded Newton steps.
+
+# Choi, Kim & Kwak (2009) rational approximation of the Bachelier implied vol
+_CKK_A = (3.994961687345134e-1, 2.100960795068497e+1, 4.980340217855084e+1, 5.988761102690991e+2,
+          1.848489695437094e+3, 6.106322407867059e+3, 2.493415285349361e+4, 1.266458051348246e+4)
+_CKK_B = (1.000000000000000e+0, 4.990534153589422e+1, 3.093573936743112e+1, 1.495105008310999e+3,
+          1.323614537899738e+3, 1.598919697679745e+4, 2.392008891720782e+4, 3.608817108375034e+3,
+          -2.067719486400926e+2, 1.174240599306013e+1)
+
+def normal_prices(k, f, t, v, is_call):
+    """Undiscounted normal (Bachelier) premiums and vegas: (price, d/dv)."""
+    k, f, t, v, is_call = np.broadcast_arrays(*(np.asarray(x) for x in (k, f, t, v, is_call)))
+    sd = np.maximum(v * np.sqrt(t), 1e-300)
+    d = (f - k) / sd
+    density = np.exp(-0.5 * d**2) / np.sqrt(2.0 * np.pi)
+    w = np.where(is_call, 1.0, -1.0)
+    price = w * (f - k) * ndtr(w * d) + sd * density
+    return price, np.sqrt(t) * density
+
+def _resolved(time_value, price):
+    """False where an in-the-money premium carries no time value above its rounding error."""
+    return (time_value == 0.0) | (time_value > 64.0 * np.finfo(float).eps * price)
+
+def _polynomial(coefficients, x):
+    result = np.zeros_like(x)
+    for c in reversed(coefficients):
+        result = result * x + c
+    return result
+
+def _normal_vol_guess(otm, k, f, t):
+    """Rational approximation from the straddle premium 2 otm + |f - k|; close to exact near the money."""
+    intrinsic = np.abs(f - k)
+    straddle = 2.0 * otm + intrinsic
+    with np.errstate(divide='ignore', invalid='ignore'):
+        nu = np.clip(intrinsic / straddle, 0.0, 1.0 - 1e-16)
+        eta = np.where(nu < 1e-8, 1.0, nu / np.arctanh(nu))
+        h = np.sqrt(eta) * _polynomial(_CKK_A, eta) / _polynomial(_CKK_B, eta)
+        return np.sqrt(np.pi / (2.0 * t)) * straddle * h
+
+def _newton(price_fn, target, x0, tol: float, max_iter: int):
+    """
+    Newton on log price_fn(x) = log target, elementwise; the log keeps deep out-of-the-money
+    premiums well scaled. price_fn returns (price, vega) and is increasing in x > 0; a bracket
+    [lo, hi] is tightened along the way and steps that leave it bisect instead.
+    """
+    x = np.array(x0, dtype=float)
+    lo = np.zeros_like(x)
+    hi = np.full_like(x, np.inf)
+    done = ~(np.isfinite(target) & (target > 0.0))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        log_target = np.log(target)
+    for _ in range(max_iter):
+        price, vega = price_fn(x)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            diff = np.log(price) - log_target
+            step = np.where((vega > 0.0) & (price > 0.0), diff * price / vega, np.inf)
+        lo = np.where(diff < 0.0, x, lo)
+        hi = np.where(diff > 0.0, x, hi)
+        newton = x - step
+        inside = (newton >= lo) & (newton <= hi) & np.isfinite(newton)
+        fallback = np.where(np.isfinite(hi), 0.5 * (lo + hi), 2.0 * x)
+        x_next = np.where(inside, newton, fallback)
+        # converged elements are frozen: a step below rounding must not trigger a bisection
+        converged = np.abs(x_next - x) <= tol * np.maximum(np.abs(x), 1e-300)
+        x = np.where(done, x, x_next)
+        done |= converged
+        if np.all(done):
+            break
+    return x
+
+def implied_normal_vol(price, k, f, t, is_call, tol: float = 1e-14, max_iter: int = 10):
+    """
+    Normal vols implied from undiscounted premiums. NaN where the premium is below intrinsic or
+    its time value is lost in rounding; zero where it equals intrinsic.
+    """
+    price, k, f, t, is_call = np.broadcast_arrays(*(np.asarray(x) for x in (price, k, f, t, is_call)))
+    price = price.astype(float)
+    k, f, t = k.astype(float), f.astype(float), t.astype(float)
+    # out-of-the-money side through put-call parity: call - put = f - k
+    intrinsic = np.where(is_call, np.maximum(f - k, 0.0), np.maximum(k - f, 0.0))
+    otm = price - intrinsic
+    otm_is_call = f <= k
+    otm_target = np.where((otm >= 0.0) & _resolved(otm, price), otm, np.nan)
+
+    guess = _normal_vol_guess(np.maximum(otm_target, 0.0), k, f, t)
+    guess = np.where(np.isfinite(guess) & (guess > 0.0), guess, 1e-4)
+    vol = _newton(lambda v: normal_prices(k, f, t, v, otm_is_call), otm_target, guess, tol, max_iter)
+    vol = np.where(otm_target == 0.0, 0.0, np.where(np.isfinite(otm_target), vol, np.nan))
+    return vol if vol.ndim > 0 else float(vol)
+
+def implied_shifted_lognormal_vol(price, k, f, s, t, is_call, tol: float = 1e-14, max_iter: int = 20):
+    """
+    Shifted lognormal vols implied from undiscounted premiums. NaN where the premium is below
+    intrinsic, its time value is lost in rounding, or it exceeds the shifted forward (call) /
+    shifted strike (put).
+    """
+    price, k, f, s, t, is_call = np.broadcast_arrays(*(np.asarray(x) for x in (price, k, f, s, t, is_call)))
+    price = price.astype(float)
+    k, f, s, t = k.astype(float), f.astype(float), s.astype(float), t.astype(float)
+    intrinsic = np.where(is_call, np.maximum(f - k, 0.0), np.maximum(k - f, 0.0))
+    otm = price - intrinsic
+    otm_is_call = f <= k
+    upper = np.where(otm_is_call, f + s, k + s)
+    otm_target = np.where((otm >= 0.0) & (otm < upper) & _resolved(otm, price), otm, np.nan)
+
+    # guess: the equivalent normal vol mapped with Hagan's first order relation
+    # v_n ~ v_sln (f - k) / log(f / k) on the shifted forward and strike
+    v_n = implied_normal_vol(np.where(np.isfinite(otm_target), otm_target, 0.0), k, f, t, otm_is_call)
+    fs, ks = f + s, k + s
+    with np.errstate(divide='ignore', invalid='ignore'):
+        log_fk = np.log(fs / ks)
+        factor = np.where(np.abs(log_fk) > 1e-8, (fs - ks) / log_fk, np.sqrt(fs * ks))
+        guess = v_n / factor
+        guess = guess * (1.0 + guess**2 * t / 24.0)
+    guess = np.where(np.isfinite(guess) & (guess > 0.0), guess, 0.2)
+
+    def price_fn(v):
+        p, _, vega = shifted_lognormal_price_derivatives(k, f, s, t, v, otm_is_call)
+        return p, vega
+
+    vol = _newton(price_fn, otm_target, guess, tol, max_iter)
+    vol = np.where(otm_target == 0.0, 0.0, np.where(np.isfinite(otm_target), vol, np.nan))
+    return vol if vol.ndim > 0 else float(vol)
+
+def normal_to_shifted_lognormal_vols(k, f, s, t, v_n):
+    """Array version of pysabr.black.normal_to_shifted_lognormal (premium match)."""
+    k, f = np.asarray(k, dtype=float), np.asarray(f, dtype=float)
+    otm_is_call = f <= k
+    price, _ = normal_prices(k, f, t, v_n, otm_is_call)
+    return implied_shifted_lognormal_vol(price, k, f, s, t, otm_is_call)
+
+def shifted_lognormal_to_normal_vols(k, f, s, t, v_sln):
+    """Array version of pysabr.black.shifted_lognormal_to_normal (premium match)."""
+    k, f = np.asarray(k, dtype=float), np.asarray(f, dtype=float)
+    otm_is_call = f <= k
+    price, _, _ = shifted_lognormal_price_derivatives(k, f, s, t, v_sln, otm_is_call)
+    return implied_normal_vol(price, k, f, t, otm_is_call)
@@ -1,8 +1,7 @@
 import numpy as np
-from pysabr.models.hagan_2002_lognormal_sabr import Hagan2002LognormalSABR
-from fixedincomelib.date.utilities import accrued
+from fixedincomelib.analytics.sabr_kernel import HaganLognormalSABR, atm_alpha
 
-class BottomUpLognormalSABR(Hagan2002LognormalSABR):
+class BottomUpLognormalSABR(HaganLognormalSABR):
     def __init__(
         self,
         f: float,
@@ -32,58 +31,41 @@ class BottomUpLognormalSABR(Hagan2002LognormalSABR):
         self._computeEffectiveParams()
 
     def _computeEffectiveParams(self):
-        dates = self._product.get_fixing_schedule()
-        Tis   = [accrued(d0, d1) for d0,d1 in zip(dates, dates[1:])]
-        total = sum(Tis)
-        weights = [Ti/total for Ti in Tis]
+        # overnight caplets and caps both cache their daily fixing accruals
+        Tis = self._product.fixingAccruals
+        total = Tis.sum()
+        weights = Tis / total
 
-        alphas = []
-        betas  = []
-        nus    = []
-        rhos   = []
-        for Ti in Tis:
-            v_n_i, b_i, nu_i, rho_i, _, _ = self._model.get_sabr_parameters(
-                index        = self._product.index,
-                expiry       = self._expiry,
-                tenor        = Ti,
-                product_type = None
-            )
-            p = Hagan2002LognormalSABR(
-                f       = self.f,
-                shift   = self.shift,
-                t       = self._expiry,
-                v_atm_n = v_n_i,
-                beta    = b_i,
-                rho     = rho_i,
-                volvol  = nu_i
-            )
-            alphas.append(p.alpha())
-            betas .append(b_i)
-            nus   .append(nu_i)
-            rhos  .append(rho_i)
-
-        T_total = sum(Tis)
-        gamma_1N = self._corr.corr(self._expiry, T_total)
-        mu = (1.0 - gamma_1N) / (len(Tis) - 1)
+        # daily schedules repeat the same few accrual lengths: look up and solve each tenor once
+        tenors, inverse = np.unique(Tis, return_inverse=True)
+        v_ns, betas, nus, rhos, _, _ = self._model.get_sabr_parameters(
+            index        = self._product.index,
+            expiry       = np.full(tenors.shape, self._expiry),
+            tenor        = tenors,
+            product_type = None
+        )
+        alphas = atm_alpha(self.f, self.shift, self._expiry, v_ns, betas, rhos, nus)
+        alphas, betas, nus, rhos = (np.asarray(x)[inverse] for x in (alphas, betas, nus, rhos))
 
         N = len(Tis)
-        taus = np.cumsum([0.0] + Tis)
-        Gamma = np.zeros((N, N))
-        for i in range(N):
-            for j in range(N):
-                dt = abs(taus[i+1] - taus[j+1])
-                Gamma[i, j] = max(0.0, 1.0 - mu * dt)
+        gamma_1N = self._corr.corr(self._expiry, total)
+        mu = (1.0 - gamma_1N) / (N - 1) if N > 1 else 0.0
+
+        # Gamma[i, j] = max(0, 1 - mu |tau_i - tau_j|) on the accrual end times
+        taus = np.cumsum(Tis)
+        Gamma = np.maximum(0.0, 1.0 - mu * np.abs(taus[:, None] - taus[None, :]))
         gamma_bar = Gamma.mean()
 
-        alpha_star = np.sqrt(gamma_bar) * sum(w*alpha*np.sqrt(Ti/total)  for w,alpha,Ti in zip(weights,alphas, Tis))
-        beta_star = sum(w*b for w,b in zip(weights, betas))
-        nu_star = sum(w*nu*np.sqrt(Ti/total) for w,nu,Ti in zip(weights, nus,   Tis))
-        rho_star = (1/np.sqrt(gamma_bar)) * sum(w*rho for w,rho in zip(weights, rhos))
+        scale = np.sqrt(Tis / total)
+        alpha_star = np.sqrt(gamma_bar) * np.sum(weights * alphas * scale)
+        beta_star = np.sum(weights * betas)
+        nu_star = np.sum(weights * nus * scale)
+        rho_star = (1/np.sqrt(gamma_bar)) * np.sum(weights * rhos)
 
-        self.volvol = nu_star
-        self.rho    = rho_star
-        self.beta   = beta_star
-        self._alphaEff = alpha_star
+        self.volvol = float(nu_star)
+        self.rho    = float(rho_star)
+        self.beta   = float(beta_star)
+        self._alphaEff = float(alpha_star)
 
     def alpha(self):
         return self._alphaEff
\ No newline at end of file
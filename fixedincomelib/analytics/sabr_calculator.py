@@ -1,32 +1,90 @@
 import pandas as pd
 import numpy as np
-from pysabr import Hagan2002LognormalSABR
+from fixedincomelib.analytics import sabr_kernel
+from fixedincomelib.analytics.implied_vol import shifted_lognormal_to_normal_vols, implied_shifted_lognormal_vol
+from fixedincomelib.analytics.sabr_pde import arbitrage_free_prices
 from fixedincomelib.sabr import SabrModel
-from fixedincomelib.analytics.sabr_top_down      import TimeDecayLognormalSABR
+from fixedincomelib.analytics.sabr_top_down      import TimeDecayLognormalSABR, time_decay_effective_params, time_decay_effective_params_derivatives
 from fixedincomelib.analytics.sabr_bottom_up     import BottomUpLognormalSABR
 from fixedincomelib.analytics.correlation_surface import CorrSurface
 from typing import Optional
 from fixedincomelib.data import DataCollection, Data2D
 
+def _shared(model: SabrModel, key: tuple, build):
+    """
+    Object registered under key on model._sharedCalculators, built on first use. The registry lives
+    on the model, so it is collected with it, and onComponentChanged empties it.
+    """
+    entries = model._sharedCalculators
+    obj = entries.get(key)
+    if obj is None:
+        obj = build()
+        entries[key] = obj
+    return obj
+
+def shared_correlation_surface(model: SabrModel, index: str) -> CorrSurface:
+    """CorrSurface of the ("corr", index) Data2D, built once per model and index."""
+    def build():
+        md = model.dataCollection.get("corr", index)
+        assert isinstance(md, Data2D)
+        return CorrSurface.from_data2d(md)
+    return _shared(model, ("CORR", str(index).upper()), build)
+
 class SABRCalculator:
 
-    def __init__(self, sabr_model: SabrModel, method: str = "bottom-up", corr_surf: Optional[CorrSurface] = None, product_type: Optional[str] | None = None, product=None):
+    KERNELS = ("pysabr", "vectorized", "pde")
+
+    def __init__(self, sabr_model: SabrModel, method: str = "bottom-up", corr_surf: Optional[CorrSurface] = None, product_type: Optional[str] | None = None, product=None, kernel: str = "pysabr", index: Optional[str] = None):
         self.model = sabr_model
         self.method = method.lower() if method is not None else None
         self.product_type = product_type
+        # bottom-up reads the fixing schedule of this product unless option_price is given one
         self.product = product
+        # "pysabr": one pysabr pricer per option; "vectorized": numpy kernel in sabr_kernel;
+        # "pde": arbitrage-free SABR density PDE (sabr_pde), one solve per smile
+        self.kernel = (kernel or "pysabr").lower()
+        if self.kernel not in self.KERNELS:
+            raise ValueError(f"Unknown SABR kernel '{kernel}', expected one of {self.KERNELS}")
 
         if self.method == "bottom-up" and corr_surf is None:
             # we expect a Data2D registered under ("corr", index)
-            md = self.model.dataCollection.get("corr", self.product.index)
-            assert isinstance(md, Data2D)
-            corr_surf = CorrSurface.from_data2d(md)
+            corr_surf = shared_correlation_surface(self.model, index if index is not None else self.product.index)
 
         self.corr_surf = corr_surf
 
-    def option_price(self, index: str, expiry: float, tenor: float, forward: float, strike: float, option_type: str) -> float:
+    @classmethod
+    def shared(cls, sabr_model: SabrModel, index: str, method: Optional[str] = None, product_type: Optional[str] = None, kernel: str = "pysabr") -> "SABRCalculator":
+        """
+        Calculator shared by all engines on (model, index, method, product_type, kernel), created on
+        first use and dropped when the model changes. It holds no product: bottom-up callers pass
+        theirs to option_price.
+        """
+        method = method.lower() if isinstance(method, str) and method else None
+        kernel = (kernel or "pysabr").lower()
+        key = (str(index).upper(), method, str(product_type).upper() if product_type else None, kernel)
+        return _shared(sabr_model, key, lambda: cls(sabr_model, method=method, product_type=product_type, kernel=kernel, index=index))
+
+    def option_price(self, index: str, expiry: float, tenor: float, forward: float, strike: float, option_type: str, product=None) -> float:
+        if self.kernel == "pde" and self.method != "bottom-up":
+            price, _, _, _ = self._vectorized_prices(index, expiry, tenor, forward, strike, option_type.upper() == "CAP")
+            return float(price)
+
         normal_vol, beta, nu, rho, shift, decay = self.model.get_sabr_parameters(index, expiry, tenor, product_type=self.product_type)
 
+        if self.kernel == "vectorized" and self.method not in ("top-down", "bottom-up"):
+            price, _ = sabr_kernel.hagan_prices(
+                k       = strike + shift,
+                f       = forward + shift,
+                s       = shift,
+                t       = expiry,
+                v_atm_n = normal_vol,
+                beta    = beta,
+                rho     = rho,
+                volvol  = nu,
+                is_call = option_type.upper() == "CAP",
+            )
+            return float(price)
+
         if self.method == "top-down":
             sabr_pricer = TimeDecayLognormalSABR(
                 f            = forward + shift,
@@ -42,6 +100,9 @@ class SABRCalculator:
         elif self.method == "bottom-up":
             if self.corr_surf is None:
                 raise ValueError("corr_df must be provided for bottom-up method")
+            product = product if product is not None else self.product
+            if product is None:
+                raise ValueError("bottom-up method needs the product's fixing schedule, pass product")
             sabr_pricer = BottomUpLognormalSABR(
                 f        = forward + shift,
                 shift    = shift,
@@ -49,11 +110,11 @@ class SABRCalculator:
                 tenor    = tenor,
                 model    = self.model,
                 corr_surf= self.corr_surf,
-                product  = self.product
+                product  = product
             )
         else:
-            # default to plain Hagan log-normal SABR
-            sabr_pricer = Hagan2002LognormalSABR(
+            # default to plain Hagan log-normal SABR, alpha from the shared ATM solver cache
+            sabr_pricer = sabr_kernel.HaganLognormalSABR(
                 f       = forward + shift,
                 shift   = shift,
                 t       = expiry,
@@ -81,3 +142,162 @@ class SABRCalculator:
                 raise AttributeError(f"No compatible put‐price method on pricer {type(sabr_pricer)}")
         
         return raw_price
+
+    def option_prices(self, index: str, expiry, tenor, forward, strike, option_type) -> np.ndarray:
+        """
+        Array version of option_price: expiry, tenor, forward, strike and option_type broadcast
+        against each other. With the vectorized or pde kernel (plain Hagan or top-down SABR) the
+        SABR parameters are looked up in one call and all options are priced in one pass.
+        """
+        expiry, tenor, forward, strike, option_type = np.broadcast_arrays(
+            np.asarray(expiry, dtype=float),
+            np.asarray(tenor, dtype=float),
+            np.asarray(forward, dtype=float),
+            np.asarray(strike, dtype=float),
+            np.asarray(option_type, dtype=object),
+        )
+        is_call = np.vectorize(lambda o: str(o).upper() == "CAP", otypes=[bool])(option_type)
+
+        if self.kernel in ("vectorized", "pde") and self.method != "bottom-up":
+            prices, _, _, _ = self._vectorized_prices(index, expiry, tenor, forward, strike, is_call)
+            return prices
+
+        prices = np.empty(expiry.shape, dtype=float)
+        for i in np.ndindex(expiry.shape):
+            prices[i] = self.option_price(index, float(expiry[i]), float(tenor[i]), float(forward[i]), float(strike[i]), option_type[i])
+        return prices
+
+    def _vectorized_prices(self, index, expiry, tenor, forward, strike, is_call):
+        """
+        One pass of the vectorized or pde kernel over broadcast option arrays (plain Hagan or
+        top-down). Returns (prices, shifted lognormal vols, vol time, shift); with the pde kernel
+        the vols are implied from the PDE premiums.
+        """
+        normal_vol, beta, nu, rho, shift, decay = self.model.get_sabr_parameters(index, expiry, tenor, product_type=self.product_type)
+        t = expiry
+        alpha = None
+        if self.method == "top-down":
+            t = expiry + tenor
+            alpha = sabr_kernel.alpha_from_atm_normal(forward + shift, shift, t, normal_vol, beta, rho, nu)
+            alpha, rho, nu = time_decay_effective_params(expiry, t, decay, alpha, rho, nu)
+        if self.kernel == "pde":
+            if alpha is None:
+                alpha = sabr_kernel.alpha_from_atm_normal(forward + shift, shift, t, normal_vol, beta, rho, nu)
+            prices = arbitrage_free_prices(strike + shift, forward + shift, shift, t, alpha, beta, rho, nu, is_call)
+            vols = implied_shifted_lognormal_vol(prices, strike + shift, forward + shift, shift, t, is_call)
+            return prices, vols, t, shift
+        prices, vols = sabr_kernel.hagan_prices(
+            k       = strike + shift,
+            f       = forward + shift,
+            s       = shift,
+            t       = t,
+            v_atm_n = normal_vol,
+            beta    = beta,
+            rho     = rho,
+            volvol  = nu,
+            is_call = is_call,
+            alpha_  = alpha,
+        )
+        return prices, vols, t, shift
+
+    def smile_surface(self, index: str, tenor: float, expiries, strikes_or_moneyness, moneyness: bool = False, forwards=None) -> dict:
+        """
+        Smiles on an (expiry x strike) grid in one vectorized pass, for the plain Hagan or the
+        top-down method. strikes_or_moneyness is a 1-D array of strikes, or of offsets added to
+        each expiry's forward when moneyness is True. Forwards default to the simple forward
+        rate over [expiry, expiry + tenor] from the index's discount factors on the model's yield
+        curve. That is the compounded rate for an overnight index but only an approximation for an
+        IBOR index, whose fixings are not implied by its discount curve: pass forwards in that case.
+        Returns a dict: EXPIRY and FORWARD (n_expiries,), and STRIKE, VOL (shifted lognormal, with
+        the time to t of the method), NORMALVOL and PRICE (undiscounted, out-of-the-money option)
+        as (n_expiries, n_strikes) arrays.
+        """
+        if self.method == "bottom-up":
+            raise NotImplementedError("Smile surfaces are not available for the bottom-up method")
+
+        expiries = np.asarray(expiries, dtype=float)
+        grid = np.asarray(strikes_or_moneyness, dtype=float)
+        if forwards is None:
+            dfs = self.model.subModel.discountFactorsAtTimes(index, np.concatenate((expiries, expiries + tenor)))
+            n = len(expiries)
+            forwards = (dfs[:n] / dfs[n:] - 1.0) / tenor
+        forwards = np.broadcast_to(np.asarray(forwards, dtype=float), expiries.shape)
+
+        strikes = forwards[:, None] + grid[None, :] if moneyness else np.broadcast_to(grid, (len(expiries), len(grid)))
+        expiry = np.broadcast_to(expiries[:, None], strikes.shape)
+        forward = np.broadcast_to(forwards[:, None], strikes.shape)
+        is_call = strikes >= forward
+
+        prices, vols, t, shift = self._vectorized_prices(index, expiry, tenor, forward, strikes, is_call)
+        # premiums are shift invariant in the normal model: convert on the pysabr shifted inputs
+        normal_vols = shifted_lognormal_to_normal_vols(strikes + shift, forward + shift, shift, t, vols)
+        return {
+            "EXPIRY":    expiries,
+            "FORWARD":   np.array(forwards),
+            "STRIKE":    np.array(strikes),
+            "VOL":       vols,
+            "NORMALVOL": normal_vols,
+            "PRICE":     prices,
+        }
+
+    def option_greeks(self, index: str, expiry, tenor, forward, strike, option_type) -> dict:
+        """
+        Analytic first order sensitivities of option prices, for arrays of options in one pass.
+        Returns a dict of arrays: PRICE and the derivatives with respect to FORWARD and to the
+        SABR parameters NORMALVOL (ATM normal vol), BETA, NU and RHO. Chains shifted Black,
+        Hagan's expansion, the ATM alpha solve (implicit function theorem), the ATM normal to
+        lognormal conversion and, for top-down, the time-decay effective parameters.
+        """
+        if self.method == "bottom-up":
+            raise NotImplementedError("Analytic SABR greeks are not available for the bottom-up method")
+        if self.kernel == "pde":
+            raise NotImplementedError("Analytic SABR greeks are not available for the pde kernel")
+
+        expiry, tenor, forward, strike, option_type = np.broadcast_arrays(
+            np.asarray(expiry, dtype=float),
+            np.asarray(tenor, dtype=float),
+            np.asarray(forward, dtype=float),
+            np.asarray(strike, dtype=float),
+            np.asarray(option_type, dtype=object),
+        )
+        is_call = np.vectorize(lambda o: str(o).upper() == "CAP", otypes=[bool])(option_type)
+        normal_vol, beta, nu, rho, shift, decay = self.model.get_sabr_parameters(index, expiry, tenor, product_type=self.product_type)
+
+        # same argument conventions as option_price: pysabr f = forward + shift, k = strike + shift
+        f = forward + shift
+        k = strike + shift
+        t = expiry + tenor if self.method == "top-down" else expiry
+
+        v_sln, dv_df, dv_dvn = sabr_kernel.atm_normal_to_shifted_lognormal_derivatives(f, shift, t, normal_vol)
+        alpha0 = sabr_kernel.alpha(v_sln, f + shift, t, beta, rho, nu)
+        da0 = sabr_kernel.alpha_derivatives(alpha0, v_sln, f + shift, t, beta, rho, nu)
+        da0_dvn = da0["v_atm_ln"] * dv_dvn
+        da0_df = da0["v_atm_ln"] * dv_df + da0["f"]
+
+        if self.method == "top-down":
+            (alpha, rho_e, nu_e), J = time_decay_effective_params_derivatives(expiry, t, decay, alpha0, rho, nu)
+        else:
+            alpha, rho_e, nu_e = alpha0, rho, nu
+            one, zero = np.ones_like(alpha0), np.zeros_like(alpha0)
+            J = {"alpha": (one, zero, zero), "rho": (zero, one, zero), "nu": (zero, zero, one)}
+        # J[p] = (d alpha_e, d rho_e, d nu_e) / d p, for p in the base (alpha, rho, nu)
+        (ae_a, re_a, ne_a), (ae_r, re_r, ne_r), (ae_n, re_n, ne_n) = J["alpha"], J["rho"], J["nu"]
+
+        vol, dvol = sabr_kernel.lognormal_vol_derivatives(k + shift, f + shift, t, alpha, beta, rho_e, nu_e)
+        price, delta, vega = sabr_kernel.shifted_lognormal_price_derivatives(k, f, shift, t, vol, is_call)
+
+        def vol_wrt_base(d_alpha0, p):
+            # d vol / d (base parameter p), through alpha0 and the effective parameters
+            a_p, r_p, n_p = J[p] if p is not None else (0.0, 0.0, 0.0)
+            return (dvol["alpha"] * (ae_a * d_alpha0 + a_p)
+                    + dvol["rho"] * (re_a * d_alpha0 + r_p)
+                    + dvol["volvol"] * (ne_a * d_alpha0 + n_p))
+
+        return {
+            "PRICE":     price,
+            "FORWARD":   delta + vega * (dvol["f"] + vol_wrt_base(da0_df, None)),
+            "NORMALVOL": vega * vol_wrt_base(da0_dvn, None),
+            "BETA":      vega * (dvol["beta"] + vol_wrt_base(da0["beta"], None)),
+            "NU":        vega * vol_wrt_base(da0["volvol"], "nu"),
+            "RHO":       vega * vol_wrt_base(da0["rho"], "rho"),
+        }
@@ -0,0 +1,335 @@
+from collections import OrderedDict
+import numpy as np
+from scipy.special import ndtr, ndtri
+from pysabr.black import normal_to_shifted_lognormal
+from pysabr.models.hagan_2002_lognormal_sabr import Hagan2002LognormalSABR
+
+# Vectorized counterparts of the pysabr Hagan 2002 lognormal pricer. Conventions follow pysabr:
+# forwards and strikes are passed unshifted together with the shift, and all inputs broadcast.
+
+_Z_EPS = 1e-07
+
+def atm_normal_to_shifted_lognormal(f, s, t, v_atm_n):
+    """
+    ATM normal vol -> ATM shifted lognormal vol, matching the premiums exactly:
+    v_n * sqrt(t / 2pi) = (f + s) * (2 N(v_sln sqrt(t) / 2) - 1).
+    """
+    f, s, t, v_atm_n = np.broadcast_arrays(*(np.asarray(x, dtype=float) for x in (f, s, t, v_atm_n)))
+    fs = f + s
+    with np.errstate(divide='ignore', invalid='ignore'):
+        u = 0.5 * (1.0 + v_atm_n * np.sqrt(t / (2.0 * np.pi)) / fs)
+        v_sln = 2.0 / np.sqrt(t) * ndtri(u)
+        # short expiries: first order expansion, which is what the premium match tends to
+        v_sln = np.where(t > 0.0, v_sln, v_atm_n / fs)
+    # no lognormal vol reproduces the premium (it exceeds f + s): defer to pysabr's optimizer
+    for i in np.flatnonzero(~np.isfinite(v_sln)):
+        v_sln.flat[i] = normal_to_shifted_lognormal(f.flat[i], f.flat[i], s.flat[i], t.flat[i], v_atm_n.flat[i])
+    return v_sln
+
+def alpha(v_atm_ln, f, t, beta, rho, volvol, tol: float = 1e-14, max_iter: int = 50):
+    """
+    SABR alpha from the ATM lognormal vol: the real root of Hagan's cubic closest to
+    v_atm_ln * f**(1 - beta), as in pysabr. f is the shifted forward. Newton iterations run
+    on the whole batch; elements that fail to converge fall back to np.roots.
+    """
+    v_atm_ln, f, t, beta, rho, volvol = np.broadcast_arrays(
+        *(np.asarray(x, dtype=float) for x in (v_atm_ln, f, t, beta, rho, volvol)))
+    f_ = f ** (beta - 1.0)
+    c3 = t * f_**3 * (1.0 - beta)**2 / 24.0
+    c2 = t * f_**2 * rho * beta * volvol / 4.0
+    c1 = (1.0 + t * volvol**2 * (2.0 - 3.0 * rho**2) / 24.0) * f_
+    c0 = -v_atm_ln
+
+    guess = v_atm_ln * f ** (1.0 - beta)
+    a = guess.copy()
+    converged = np.zeros(a.shape, dtype=bool)
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        for _ in range(max_iter):
+            p = ((c3 * a + c2) * a + c1) * a + c0
+            dp = (3.0 * c3 * a + 2.0 * c2) * a + c1
+            step = np.where(dp != 0.0, p / dp, 0.0)
+            a = a - step
+            converged = np.abs(step) <= tol * np.maximum(np.abs(a), 1.0)
+            if np.all(converged):
+                break
+
+    # Newton may land on another root when the cubic is not monotone around the guess
+    dp = (3.0 * c3 * a + 2.0 * c2) * a + c1
+    coefficients = np.isfinite(c3) & np.isfinite(c2) & np.isfinite(c1) & np.isfinite(c0)
+    suspect = coefficients & (~converged | ~np.isfinite(a) | (dp <= 0.0))
+    for i in np.flatnonzero(suspect):
+        roots = np.roots([c3.flat[i], c2.flat[i], c1.flat[i], c0.flat[i]])
+        real = np.extract(np.isreal(roots), np.real(roots))
+        a.flat[i] = real[np.argmin(np.abs(real - guess.flat[i]))]
+    return a
+
+def alpha_from_atm_normal(f, s, t, v_atm_n, beta, rho, volvol):
+    """
+    pysabr Hagan2002LognormalSABR.alpha() for arrays, with the ATM conversion solved in closed
+    form: it matches the ATM premium to rounding where pysabr's CG optimizer stops at about 1e-6,
+    so alphas differ from pysabr's by up to a few 1e-6 relative (tests/test_sabr_alpha.ipynb).
+    """
+    f = np.asarray(f, dtype=float)
+    s = np.asarray(s, dtype=float)
+    v_atm_sln = atm_normal_to_shifted_lognormal(f, s, t, v_atm_n)
+    return alpha(v_atm_sln, f + s, t, beta, rho, volvol)
+
+class AtmAlphaCache:
+    """
+    Bounded LRU of alpha_from_atm_normal results keyed on the exact
+    (f, shift, t, v_atm_n, beta, rho, volvol) inputs. solve() takes arrays: cached rows are
+    looked up, the misses are solved together in one vectorized call.
+    """
+
+    def __init__(self, maxsize: int = 4096):
+        self.maxsize = int(maxsize)
+        self._store = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def solve(self, f, s, t, v_atm_n, beta, rho, volvol):
+        inputs = np.broadcast_arrays(*(np.asarray(x, dtype=float) for x in (f, s, t, v_atm_n, beta, rho, volvol)))
+        shape = inputs[0].shape
+        keys = list(zip(*(x.ravel().tolist() for x in inputs)))
+        out = np.empty(len(keys), dtype=float)
+
+        missing = {}
+        for i, key in enumerate(keys):
+            value = self._store.get(key)
+            if value is None:
+                missing.setdefault(key, []).append(i)
+            else:
+                self._store.move_to_end(key)
+                out[i] = value
+        self.hits += len(keys) - sum(len(v) for v in missing.values())
+        self.misses += len(missing)
+
+        if missing:
+            rows = np.array(list(missing.keys()), dtype=float)
+            solved = alpha_from_atm_normal(*rows.T)
+            for key, a, positions in zip(missing.keys(), solved.tolist(), missing.values()):
+                out[positions] = a
+                self._store[key] = a
+            while len(self._store) > self.maxsize:
+                self._store.popitem(last=False)
+        return out.reshape(shape)
+
+    def cache_info(self):
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._store), "maxsize": self.maxsize}
+
+    def clear(self):
+        self._store.clear()
+        self.hits = 0
+        self.misses = 0
+
+ALPHA_CACHE = AtmAlphaCache()
+
+def atm_alpha(f, s, t, v_atm_n, beta, rho, volvol):
+    """Cached, batched alpha_from_atm_normal; returns a float for scalar inputs."""
+    a = ALPHA_CACHE.solve(f, s, t, v_atm_n, beta, rho, volvol)
+    return float(a) if a.ndim == 0 else a
+
+class HaganLognormalSABR(Hagan2002LognormalSABR):
+    """
+    pysabr Hagan 2002 pricer whose alpha() goes through the shared cached solver, i.e. the closed
+    form ATM conversion of alpha_from_atm_normal rather than pysabr's optimizer.
+    """
+
+    def alpha(self):
+        if getattr(self, "_alphaAtm", None) is None:
+            self._alphaAtm = atm_alpha(self.f, self.shift, self.t, self.v_atm_n, self.beta, self.rho, self.volvol)
+        return self._alphaAtm
+
+def lognormal_vol(k, f, t, alpha, beta, rho, volvol):
+    """Hagan's 2002 SABR lognormal vol expansion; zero where k <= 0 or f <= 0."""
+    k, f, t, alpha, beta, rho, volvol = np.broadcast_arrays(
+        *(np.asarray(x, dtype=float) for x in (k, f, t, alpha, beta, rho, volvol)))
+    valid = (k > 0.0) & (f > 0.0)
+    k_ = np.where(valid, k, 1.0)
+    f_ = np.where(valid, f, 1.0)
+
+    logfk = np.log(f_ / k_)
+    fkbeta = (f_ * k_) ** (1.0 - beta)
+    a = (1.0 - beta)**2 * alpha**2 / (24.0 * fkbeta)
+    b = 0.25 * rho * beta * volvol * alpha / fkbeta**0.5
+    c = (2.0 - 3.0 * rho**2) * volvol**2 / 24.0
+    d = fkbeta**0.5
+    v = (1.0 - beta)**2 * logfk**2 / 24.0
+    w = (1.0 - beta)**4 * logfk**4 / 1920.0
+    z = volvol * fkbeta**0.5 * logfk / alpha
+
+    large = np.abs(z) > _Z_EPS
+    z_ = np.where(large, z, 1.0)
+    x = np.log(((1.0 - 2.0 * rho * z_ + z_**2)**0.5 + z_ - rho) / (1.0 - rho))
+    ratio = np.where(large, z_ / x, 1.0)
+    vol = alpha * ratio * (1.0 + (a + b + c) * t) / (d * (1.0 + v + w))
+    return np.where(valid, vol, 0.0)
+
+def shifted_lognormal_price(k, f, s, t, v, is_call):
+    """Undiscounted shifted Black premium; zero where the shifted strike/forward, t or v is not positive."""
+    k, f, s, t, v, is_call = np.broadcast_arrays(
+        *(np.asarray(x) for x in (k, f, s, t, v, is_call)))
+    ks = k + s
+    fs = f + s
+    valid = (ks > 0.0) & (fs > 0.0) & (t > 0.0) & (v > 0.0)
+    ks_ = np.where(valid, ks, 1.0)
+    fs_ = np.where(valid, fs, 1.0)
+    sd = np.where(valid, v * np.sqrt(np.where(valid, t, 1.0)), 1.0)
+
+    d1 = (np.log(fs_ / ks_) + 0.5 * sd**2) / sd
+    d2 = d1 - sd
+    call = fs_ * ndtr(d1) - ks_ * ndtr(d2)
+    put = ks_ * ndtr(-d2) - fs_ * ndtr(-d1)
+    return np.where(valid, np.where(is_call, call, put), 0.0)
+
+def hagan_prices(k, f, s, t, v_atm_n, beta, rho, volvol, is_call, alpha_=None):
+    """
+    Batched Hagan2002LognormalSABR(f, s, t, v_atm_n, beta, rho, volvol).call(k, cp).
+    Returns (prices, shifted lognormal vols). alpha_ overrides the ATM calibration.
+    """
+    if alpha_ is None:
+        alpha_ = alpha_from_atm_normal(f, s, t, v_atm_n, beta, rho, volvol)
+    s = np.asarray(s, dtype=float)
+    vols = lognormal_vol(np.asarray(k, dtype=float) + s, np.asarray(f, dtype=float) + s,
+                         t, alpha_, beta, rho, volvol)
+    return shifted_lognormal_price(k, f, s, t, vols, is_call), vols
+
+### first order sensitivities of the pieces above, same broadcasting conventions
+
+def atm_normal_to_shifted_lognormal_derivatives(f, s, t, v_atm_n):
+    """Returns (v_sln, d v_sln / d(f + s), d v_sln / d v_atm_n) of atm_normal_to_shifted_lognormal."""
+    v_sln = atm_normal_to_shifted_lognormal(f, s, t, v_atm_n)
+    f, s, t, v_atm_n = np.broadcast_arrays(*(np.asarray(x, dtype=float) for x in (f, s, t, v_atm_n)))
+    fs = f + s
+    with np.errstate(divide='ignore', invalid='ignore'):
+        sqrt_t = np.sqrt(t)
+        # premium match: v_n sqrt(t/2pi) = fs (2 N(v_sln sqrt(t)/2) - 1)
+        density = np.exp(-0.125 * v_sln**2 * t) / np.sqrt(2.0 * np.pi)
+        d_vn = np.sqrt(t / (2.0 * np.pi)) / (fs * sqrt_t * density)
+        d_fs = -v_atm_n * d_vn / fs
+        d_vn = np.where(t > 0.0, d_vn, 1.0 / fs)
+        d_fs = np.where(t > 0.0, d_fs, -v_atm_n / fs**2)
+    return v_sln, d_fs, d_vn
+
+def alpha_derivatives(alpha_, v_atm_ln, f, t, beta, rho, volvol):
+    """
+    Implicit derivatives of alpha (the cubic root) with respect to v_atm_ln, f, beta, rho
+    and volvol; f is the shifted forward. Returns a dict keyed by those names.
+    """
+    alpha_, v_atm_ln, f, t, beta, rho, volvol = np.broadcast_arrays(
+        *(np.asarray(x, dtype=float) for x in (alpha_, v_atm_ln, f, t, beta, rho, volvol)))
+    lnf = np.log(f)
+    f_ = f ** (beta - 1.0)
+    c3 = t * f_**3 * (1.0 - beta)**2 / 24.0
+    c2 = t * f_**2 * rho * beta * volvol / 4.0
+    c1 = (1.0 + t * volvol**2 * (2.0 - 3.0 * rho**2) / 24.0) * f_
+    a1, a2, a3 = alpha_, alpha_**2, alpha_**3
+
+    dp_dalpha = 3.0 * c3 * a2 + 2.0 * c2 * a1 + c1
+    dp = {
+        "v_atm_ln": -np.ones_like(alpha_),
+        "f":        (beta - 1.0) / f * (3.0 * c3 * a3 + 2.0 * c2 * a2 + c1 * a1),
+        "beta":     ((3.0 * lnf * c3 - t * f_**3 * (1.0 - beta) / 12.0) * a3
+                     + (2.0 * lnf * c2 + t * f_**2 * rho * volvol / 4.0) * a2
+                     + lnf * c1 * a1),
+        "rho":      t * f_**2 * beta * volvol / 4.0 * a2 - t * volvol**2 * rho / 4.0 * f_ * a1,
+        "volvol":   t * f_**2 * rho * beta / 4.0 * a2 + t * volvol * (2.0 - 3.0 * rho**2) / 12.0 * f_ * a1,
+    }
+    return {name: -value / dp_dalpha for name, value in dp.items()}
+
+def lognormal_vol_derivatives(k, f, t, alpha, beta, rho, volvol):
+    """
+    Hagan lognormal vol and its partial derivatives with respect to f, alpha, beta, rho and
+    volvol (dict keyed by those names). Derivatives are zero where the vol is floored at zero.
+    """
+    k, f, t, alpha, beta, rho, volvol = np.broadcast_arrays(
+        *(np.asarray(x, dtype=float) for x in (k, f, t, alpha, beta, rho, volvol)))
+    valid = (k > 0.0) & (f > 0.0)
+    k_ = np.where(valid, k, 1.0)
+    f_ = np.where(valid, f, 1.0)
+    ob = 1.0 - beta
+
+    logfk = np.log(f_ / k_)
+    fkbeta = (f_ * k_) ** ob
+    d = fkbeta**0.5
+    a = ob**2 * alpha**2 / (24.0 * fkbeta)
+    b = 0.25 * rho * beta * volvol * alpha / d
+    c = (2.0 - 3.0 * rho**2) * volvol**2 / 24.0
+    v = ob**2 * logfk**2 / 24.0
+    w = ob**4 * logfk**4 / 1920.0
+    z = volvol * d * logfk / alpha
+
+    large = np.abs(z) > _Z_EPS
+    z_ = np.where(large, z, 1.0)
+    S = (1.0 - 2.0 * rho * z_ + z_**2)**0.5
+    A = S + z_ - rho
+    x = np.log(A / (1.0 - rho))
+    R = np.where(large, z_ / x, 1.0)
+    # R = z / x(z, rho); small z limits: dR/dz = -rho / 2, dR/drho = 0
+    R_z = np.where(large, (x - z_ / S) / x**2, -0.5 * rho)
+    R_rho = np.where(large, -z_ * ((-z_ / S - 1.0) / A + 1.0 / (1.0 - rho)) / x**2, 0.0)
+
+    N = 1.0 + (a + b + c) * t
+    D = 1.0 + v + w
+    vol = alpha * R * N / (d * D)
+
+    # partials of the building blocks
+    lnfk = np.log(f_ * k_)
+    P_f_over_P = ob / f_
+    P_beta_over_P = -lnfk
+    d_f = 0.5 * d * P_f_over_P
+    d_beta = 0.5 * d * P_beta_over_P
+    L_f = 1.0 / f_
+
+    grads = {}
+    # f
+    a_f = -a * P_f_over_P
+    b_f = -b * d_f / d
+    v_f = ob**2 * logfk * L_f / 12.0
+    w_f = ob**4 * logfk**3 * L_f / 480.0
+    z_f = volvol * (d_f * logfk + d * L_f) / alpha
+    grads["f"] = R_z * z_f / R + (a_f + b_f) * t / N - d_f / d - (v_f + w_f) / D
+    # alpha
+    grads["alpha"] = 1.0 / alpha + R_z * (-z / alpha) / R + (2.0 * a / alpha + b / alpha) * t / N
+    # beta
+    a_beta = -ob * alpha**2 / (12.0 * fkbeta) - a * P_beta_over_P
+    b_beta = 0.25 * rho * volvol * alpha / d - b * d_beta / d
+    v_beta = -ob * logfk**2 / 12.0
+    w_beta = -ob**3 * logfk**4 / 480.0
+    z_beta = volvol * d_beta * logfk / alpha
+    grads["beta"] = R_z * z_beta / R + (a_beta + b_beta) * t / N - d_beta / d - (v_beta + w_beta) / D
+    # rho
+    b_rho = 0.25 * beta * volvol * alpha / d
+    c_rho = -rho * volvol**2 / 4.0
+    grads["rho"] = R_rho / R + (b_rho + c_rho) * t / N
+    # volvol
+    b_nu = 0.25 * rho * beta * alpha / d
+    c_nu = (2.0 - 3.0 * rho**2) * volvol / 12.0
+    z_nu = d * logfk / alpha
+    grads["volvol"] = R_z * z_nu / R + (b_nu + c_nu) * t / N
+
+    vol = np.where(valid, vol, 0.0)
+    return vol, {name: np.where(valid, vol * g, 0.0) for name, g in grads.items()}
+
+def shifted_lognormal_price_derivatives(k, f, s, t, v, is_call):
+    """Shifted Black premium with its forward delta and vega: (price, d/df, d/dv)."""
+    k, f, s, t, v, is_call = np.broadcast_arrays(
+        *(np.asarray(x) for x in (k, f, s, t, v, is_call)))
+    ks = k + s
+    fs = f + s
+    valid = (ks > 0.0) & (fs > 0.0) & (t > 0.0) & (v > 0.0)
+    ks_ = np.where(valid, ks, 1.0)
+    fs_ = np.where(valid, fs, 1.0)
+    sqrt_t = np.sqrt(np.where(valid, t, 1.0))
+    sd = np.where(valid, v * sqrt_t, 1.0)
+
+    d1 = (np.log(fs_ / ks_) + 0.5 * sd**2) / sd
+    d2 = d1 - sd
+    call = fs_ * ndtr(d1) - ks_ * ndtr(d2)
+    put = ks_ * ndtr(-d2) - fs_ * ndtr(-d1)
+    price = np.where(is_call, call, put)
+    delta = np.where(is_call, ndtr(d1), ndtr(d1) - 1.0)
+    vega = fs_ * sqrt_t * np.exp(-0.5 * d1**2) / np.sqrt(2.0 * np.pi)
+    return (np.where(valid, price, 0.0),
+            np.where(valid, delta, 0.0),
+            np.where(valid, vega, 0.0))
@@ -1,7 +1,7 @@
 import numpy as np
-from pysabr.models.hagan_2002_lognormal_sabr import Hagan2002LognormalSABR
+from fixedincomelib.analytics.sabr_kernel import HaganLognormalSABR
 
-class TimeDecayLognormalSABR(Hagan2002LognormalSABR):
+class TimeDecayLognormalSABR(HaganLognormalSABR):
 
     def __init__(self, f, shift, t, vAtmN, beta, rho, volVol, volDecaySpeed, decayStart):
         self._ts = decayStart
@@ -11,26 +11,35 @@ class TimeDecayLognormalSABR(Hagan2002LognormalSABR):
         self._computeEffectiveParams()
 
     def _computeEffectiveParams(self):
-        ts = self._ts
-        te = self._te
+        alpha = super().alpha()
+        alphaEff, rhoEff, nuEff = time_decay_effective_params(
+            self._ts, self._te, self.volDecaySpeed, alpha, self.rho, self.volvol)
 
-        if ts >= te:
-            self._alphaEff = super().alpha()
-            return
+        self.volvol    = float(nuEff)
+        self.rho       = float(rhoEff)
+        self._alphaEff = float(alphaEff)
 
-        volDecaySpeed = self.volDecaySpeed
-        alpha = super().alpha()
-        rho   = self.rho
-        nu    = self.volvol
+    def alpha(self):
+        return self._alphaEff
+
+def time_decay_effective_params(ts, te, volDecaySpeed, alpha, rho, nu):
+    """
+    Effective (alpha, rho, nu) of the time-decay SABR for a period decaying from ts to te.
+    All inputs broadcast; where ts >= te the base parameters are returned unchanged.
+    """
+    ts, te, volDecaySpeed, alpha, rho, nu = np.broadcast_arrays(
+        *(np.asarray(x, dtype=float) for x in (ts, te, volDecaySpeed, alpha, rho, nu)))
+    decaying = ts < te
 
-        # build tau
-        tau = 2 * volDecaySpeed * ts + te
+    # build tau
+    tau = 2 * volDecaySpeed * ts + te
 
-        # gamma
-        gammaFirstTerm = tau * (2 * tau**3+ te**3+ (4 * volDecaySpeed * volDecaySpeed - 2 * volDecaySpeed) * ts**3+ 6 * volDecaySpeed * ts**2 * te)
-        gammaSecondTerm = (3 * volDecaySpeed * rho * rho * (te - ts)**2* (3 * tau**2 - te**2 + 5 * volDecaySpeed * ts**2 + 4 * ts * te))
-        gamma = (gammaFirstTerm / ((4 * volDecaySpeed + 3) * (2 * volDecaySpeed + 1))+ gammaSecondTerm / ((4 * volDecaySpeed + 3) * (3 * volDecaySpeed + 2)**2))
+    # gamma
+    gammaFirstTerm = tau * (2 * tau**3+ te**3+ (4 * volDecaySpeed * volDecaySpeed - 2 * volDecaySpeed) * ts**3+ 6 * volDecaySpeed * ts**2 * te)
+    gammaSecondTerm = (3 * volDecaySpeed * rho * rho * (te - ts)**2* (3 * tau**2 - te**2 + 5 * volDecaySpeed * ts**2 + 4 * ts * te))
+    gamma = (gammaFirstTerm / ((4 * volDecaySpeed + 3) * (2 * volDecaySpeed + 1))+ gammaSecondTerm / ((4 * volDecaySpeed + 3) * (3 * volDecaySpeed + 2)**2))
 
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
         # nu-hat squared
         nuHat2 = nu * nu * gamma * (2 * volDecaySpeed + 1) / (tau**3 * te)
 
@@ -43,9 +52,50 @@ class TimeDecayLognormalSABR(Hagan2002LognormalSABR):
         # rho-hat
         rhoHat = (rho* (3 * tau * tau + 2 * volDecaySpeed * ts * ts + te * te)/ (np.sqrt(gamma) * (6 * volDecaySpeed + 4)))
 
-        self.volvol    = np.sqrt(nuHat2)
-        self.rho       = rhoHat
-        self._alphaEff = np.sqrt(alphaHat2)
+    return (np.where(decaying, np.sqrt(alphaHat2), alpha),
+            np.where(decaying, rhoHat, rho),
+            np.where(decaying, np.sqrt(nuHat2), nu))
 
-    def alpha(self):
-        return self._alphaEff
+def time_decay_effective_params_derivatives(ts, te, volDecaySpeed, alpha, rho, nu):
+    """
+    time_decay_effective_params together with its Jacobian: returns
+    ((alphaEff, rhoEff, nuEff), J) where J[p] = (d alphaEff, d rhoEff, d nuEff) / d p
+    for p in ("alpha", "rho", "nu").
+    """
+    alphaEff, rhoEff, nuEff = time_decay_effective_params(ts, te, volDecaySpeed, alpha, rho, nu)
+    ts, te, volDecaySpeed, alpha, rho, nu = np.broadcast_arrays(
+        *(np.asarray(x, dtype=float) for x in (ts, te, volDecaySpeed, alpha, rho, nu)))
+    decaying = ts < te
+    k = volDecaySpeed
+
+    tau = 2 * k * ts + te
+    # gamma = g1 + rho^2 * g2, as in time_decay_effective_params
+    g1 = tau * (2 * tau**3 + te**3 + (4 * k * k - 2 * k) * ts**3 + 6 * k * ts**2 * te) / ((4 * k + 3) * (2 * k + 1))
+    g2 = (3 * k * (te - ts)**2 * (3 * tau**2 - te**2 + 5 * k * ts**2 + 4 * ts * te)) / ((4 * k + 3) * (3 * k + 2)**2)
+    gamma = g1 + rho * rho * g2
+    gamma_rho = 2 * rho * g2
+
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        c_nu = gamma * (2 * k + 1) / (tau**3 * te)
+        nuHat2_nu = 2 * nu * c_nu
+        nuHat2_rho = nu * nu * gamma_rho * (2 * k + 1) / (tau**3 * te)
+        c_h = (tau**2 + 2 * k * ts**2 + te**2) / (2 * te * tau * (k + 1))
+        H_nu = 2 * nu * c_h - nuHat2_nu
+        H_rho = -nuHat2_rho
+
+        # alphaEff = sqrt(alphaHat2), nuEff = nu * sqrt(c_nu)
+        aE_alpha = alphaEff / alpha
+        aE_nu = 0.25 * te * alphaEff * H_nu
+        aE_rho = 0.25 * te * alphaEff * H_rho
+        nE_nu = np.sqrt(c_nu)
+        nE_rho = 0.5 * nu * gamma_rho * (2 * k + 1) / (tau**3 * te) / np.sqrt(c_nu)
+        c_r = (3 * tau * tau + 2 * k * ts * ts + te * te) / (6 * k + 4)
+        rE_rho = c_r / np.sqrt(gamma) - rho * c_r * gamma_rho / (2 * gamma**1.5)
+
+    one, zero = np.ones_like(alpha), np.zeros_like(alpha)
+    J = {
+        "alpha": (np.where(decaying, aE_alpha, one), zero, zero),
+        "rho":   (np.where(decaying, aE_rho, zero), np.where(decaying, rE_rho, one), np.where(decaying, nE_rho, zero)),
+        "nu":    (np.where(decaying, aE_nu, zero), zero, np.where(decaying, nE_nu, one)),
+    }
+    return (alphaEff, rhoEff, nuEff), J
@@ -1,5 +1,6 @@
 from fixedincomelib.data.base import MarketData
 from fixedincomelib.data.data1d import Data1D
 from fixedincomelib.data.data2d import Data2D
+from fixedincomelib.data.data3d import Data3D
 from fixedincomelib.data.data_collection import DataCollection
 from fixedincomelib.data.yc_market_loader import build_yc_data_collection
\ No newline at end of file
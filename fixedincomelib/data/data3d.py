@@ -0,0 +1,108 @@
+from typing import Sequence, Union
+import numpy as np
+import pandas as pd
+from fixedincomelib.data.base import MarketData
+
+class Data3D(MarketData):
+    """
+    (axis1 x axis2 x axis3) grid, e.g. a swaption smile cube (expiry x tenor x strike),
+    held in one contiguous float array of shape (len(axis1), len(axis2), len(axis3)).
+    """
+
+    def __init__(
+        self,
+        data_type: str,
+        data_convention: str,
+        axis1: Sequence[float],
+        axis2: Sequence[float],
+        axis3: Sequence[float],
+        values: Union[np.ndarray, Sequence]
+    ):
+        super().__init__(data_type, data_convention)
+
+        self.axis1 = np.asarray(axis1, dtype=float)
+        self.axis2 = np.asarray(axis2, dtype=float)
+        self.axis3 = np.asarray(axis3, dtype=float)
+        self.values = np.ascontiguousarray(values, dtype=float)
+
+        shape = (len(self.axis1), len(self.axis2), len(self.axis3))
+        if self.values.shape != shape:
+            raise ValueError(f"`values` has shape {self.values.shape}, expected {shape} from the axes")
+        for name, axis in (("axis1", self.axis1), ("axis2", self.axis2), ("axis3", self.axis3)):
+            if np.any(np.diff(axis) <= 0.0):
+                raise ValueError(f"`{name}` must be strictly increasing")
+
+    def __repr__(self) -> str:
+        return (
+            f"Data3D(type={self.data_type!r}, "
+            f"conv={self.data_convention!r}, "
+            f"shape={self.values.shape})"
+        )
+
+    def interpolate(self, x, y, z):
+        """Trilinear interpolation with flat extrapolation; x, y and z broadcast against each other."""
+        # same axis bracketing as Interpolator2D; imported here as utilities loads the models, which load data
+        from fixedincomelib.utilities.numerics import _bracket
+        xs, ys, zs = np.broadcast_arrays(*(np.asarray(v, dtype=float) for v in (x, y, z)))
+        i0, i1, tx = _bracket(self.axis1, xs)
+        j0, j1, ty = _bracket(self.axis2, ys)
+        k0, k1, tz = _bracket(self.axis3, zs)
+
+        v = self.values
+        # collapse one axis at a time: z, then y, then x
+        c00 = v[i0, j0, k0] * (1.0 - tz) + v[i0, j0, k1] * tz
+        c01 = v[i0, j1, k0] * (1.0 - tz) + v[i0, j1, k1] * tz
+        c10 = v[i1, j0, k0] * (1.0 - tz) + v[i1, j0, k1] * tz
+        c11 = v[i1, j1, k0] * (1.0 - tz) + v[i1, j1, k1] * tz
+        c0 = c00 * (1.0 - ty) + c01 * ty
+        c1 = c10 * (1.0 - ty) + c11 * ty
+        result = c0 * (1.0 - tx) + c1 * tx
+        return float(result) if result.ndim == 0 else result
+
+    def expirySlice(self, expiry: float) -> np.ndarray:
+        """(axis2 x axis3) view of the grid at an axis1 node; no copy."""
+        return self.values[_node(self.axis1, expiry, "axis1")]
+
+    def tenorSlice(self, tenor: float) -> np.ndarray:
+        """(axis1 x axis3) view of the grid at an axis2 node; no copy."""
+        return self.values[:, _node(self.axis2, tenor, "axis2")]
+
+    @classmethod
+    def createDataObject(
+        cls,
+        data_type: str,
+        data_convention: str,
+        df: pd.DataFrame
+    ) -> "Data3D":
+        """
+        Bulk loader from a long-format DataFrame with AXIS1, AXIS2, AXIS3 and VALUES columns,
+        one row per node in any order. Columns are read as arrays and scattered into the grid.
+        """
+        if not isinstance(df, pd.DataFrame):
+            raise TypeError("Input must be a pandas DataFrame")
+
+        if not {"AXIS1", "AXIS2", "AXIS3", "VALUES"}.issubset(df.columns):
+            raise ValueError("DataFrame must have 'AXIS1', 'AXIS2', 'AXIS3' and 'VALUES' columns")
+
+        axis1, i = np.unique(df["AXIS1"].to_numpy(dtype=float), return_inverse=True)
+        axis2, j = np.unique(df["AXIS2"].to_numpy(dtype=float), return_inverse=True)
+        axis3, k = np.unique(df["AXIS3"].to_numpy(dtype=float), return_inverse=True)
+        shape = (len(axis1), len(axis2), len(axis3))
+
+        flat = np.ravel_multi_index((i, j, k), shape)
+        if len(np.unique(flat)) != len(flat):
+            raise ValueError("Duplicate (AXIS1, AXIS2, AXIS3) nodes")
+        if len(flat) != np.prod(shape):
+            raise ValueError(f"{len(flat)} rows do not fill the {shape[0]} x {shape[1]} x {shape[2]} grid")
+
+        values = np.empty(shape, dtype=float)
+        values.reshape(-1)[flat] = df["VALUES"].to_numpy(dtype=float)
+
+        dt = data_type.lower()
+        return cls(dt, data_convention, axis1, axis2, axis3, values)
+
+def _node(axis: np.ndarray, value: float, name: str) -> int:
+    hits = np.flatnonzero(np.isclose(axis, value, rtol=0.0, atol=1e-12))
+    if len(hits) == 0:
+        raise KeyError(f"{value} is not a node of {name} {axis.tolist()}")
+    return int(hits[0])
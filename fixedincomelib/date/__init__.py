@@ -1,4 +1,5 @@
 from fixedincomelib.date.classes import (Date, Period, TermOrTerminationDate)
 from fixedincomelib.date.utilities import (
     addPeriod, accrued, moveToBusinessDay, isBusinessDay, isHoliday, applyOffset,
-    isWeekend, isEndOfMonth, endOfMonth, makeSchedule, business_day_schedule)
\ No newline at end of file
+    isWeekend, isEndOfMonth, endOfMonth, makeSchedule, business_day_schedule,
+    business_day_serials, clear_business_day_schedules)
\ No newline at end of file
@@ -1,7 +1,9 @@
+import numpy as np
 import pandas as pd
 import QuantLib as ql
 from QuantLib import Schedule, Period, Days, Following, DateGeneration
 from typing import Optional
+from collections import OrderedDict
 from fixedincomelib.date.classes import (Date, Period)
 from fixedincomelib.market import *
 
@@ -91,19 +93,47 @@ def makeSchedule(
     
     return df
 
+# (calendar name, start serial, end serial) -> read-only int64 array of business day serials,
+# a bounded LRU: the least recently used schedule is dropped beyond BUSINESS_DAY_SCHEDULE_CACHE_SIZE
+BUSINESS_DAY_SCHEDULE_CACHE_SIZE = 1024
+_BUSINESS_DAY_SCHEDULES: "OrderedDict[tuple, np.ndarray]" = OrderedDict()
+
+def clear_business_day_schedules() -> None:
+    """Drops the cached business_day_serials schedules."""
+    _BUSINESS_DAY_SCHEDULES.clear()
+
+def business_day_serials(
+    start_date: Date,
+    end_date:   Date,
+    calendar) -> np.ndarray:
+    """
+    Serial numbers of the daily (Following) schedule from start_date to end_date. Cached per
+    (calendar, start, end) in a process-wide LRU and shared, so the array must not be modified.
+    """
+    key = (calendar.name(), start_date.serialNumber(), end_date.serialNumber())
+    serials = _BUSINESS_DAY_SCHEDULES.get(key)
+    if serials is not None:
+        _BUSINESS_DAY_SCHEDULES.move_to_end(key)
+    else:
+        ql_sched = ql.Schedule(
+            start_date,
+            end_date,
+            ql.Period(1, ql.Days),
+            calendar,
+            ql.Following, ql.Following,
+            ql.DateGeneration.Forward,
+            False
+        )
+        serials = np.fromiter((d.serialNumber() for d in ql_sched), dtype=np.int64)
+        serials.flags.writeable = False
+        _BUSINESS_DAY_SCHEDULES[key] = serials
+        if len(_BUSINESS_DAY_SCHEDULES) > BUSINESS_DAY_SCHEDULE_CACHE_SIZE:
+            _BUSINESS_DAY_SCHEDULES.popitem(last=False)
+    return serials
+
 def business_day_schedule(
     start_date: Date,
     end_date:   Date,
     calendar) -> list[Date]:
 
-    ql_sched = ql.Schedule(
-        start_date,
-        end_date,
-        ql.Period(1, ql.Days),
-        calendar,
-        ql.Following, ql.Following,
-        ql.DateGeneration.Forward,
-        False
-    )
-
-    return [ Date(d) for d in ql_sched ]
+    return [ Date(ql.Date(int(s))) for s in business_day_serials(start_date, end_date, calendar) ]
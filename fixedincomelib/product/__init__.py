@@ -1,5 +1,5 @@
 from fixedincomelib.product.product import (LongOrShort, Product)
 from fixedincomelib.product.portfolio import (ProductPortfolio)
-from fixedincomelib.product.linear_products import (ProductBulletCashflow, ProductFuture, ProductIborCashflow, ProductOvernightIndexCashflow, ProductRfrFuture, ProductIborSwap, ProductOvernightSwap, InterestRateStream)
-from fixedincomelib.product.product_display_visitor import (CashflowVisitor, FutureVisitor, IborCashflowVisitor, OvernightCashflowVisitor, RfrFutureVisitor, IborSwapVisitor, OvernightSwapVisitor, IborCapFloorletVisitor, OvernightCapFloorletVisitor, IborCapFloorVisitor, OvernightCapFloorVisitor, IborSwaptionVisitor, OvernightSwaptionVisitor)
+from fixedincomelib.product.linear_products import (ProductBulletCashflow, ProductFuture, ProductIborCashflow, ProductOvernightIndexCashflow, ProductRfrFuture, ProductIborSwap, ProductOvernightSwap, InterestRateStream, CashflowTable)
+from fixedincomelib.product.product_display_visitor import (CashflowVisitor, FutureVisitor, IborCashflowVisitor, OvernightCashflowVisitor, RfrFutureVisitor, IborSwapVisitor, OvernightSwapVisitor, IborCapFloorletVisitor, OvernightCapFloorletVisitor, IborCapFloorVisitor, OvernightCapFloorVisitor, IborSwaptionVisitor, OvernightSwaptionVisitor, InterestRateStreamVisitor)
 from fixedincomelib.product.non_linear_products import (ProductIborCapFloorlet, ProductOvernightCapFloorlet, CapFloorStream, ProductIborCapFloor, ProductOvernightCapFloor, ProductIborSwaption, ProductOvernightSwaption)
\ No newline at end of file
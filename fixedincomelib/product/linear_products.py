@@ -1,9 +1,10 @@
+import numpy as np
 import pandas as pd
 from fixedincomelib.market.basics import AccrualBasis, BusinessDayConvention, HolidayConvention
 from fixedincomelib.product.product import LongOrShort, ProductVisitor, Product
 from fixedincomelib.date import (Date, Period, TermOrTerminationDate)
 from fixedincomelib.market import (IndexRegistry, Currency)
-from typing import List, Optional, Union
+from typing import List, Optional, Tuple, Union
 from fixedincomelib.date.utilities import makeSchedule,accrued
 from fixedincomelib.product.portfolio import ProductPortfolio
 
@@ -296,7 +297,127 @@ class ProductRfrFuture(Product):
 # Composition: Streams & Swaps
 # --------------------------------
 
+class CashflowTable:
+    """
+    Struct-of-arrays view of a stream's cashflows, one entry per schedule row: accrual start, end
+    and payment dates as serial numbers, accrual factors (accrued(start, end)), notionals, spreads
+    and, for a fixed leg, the coupon rate. kind is "IBOR", "OVERNIGHT" or "FIXED"; index,
+    compounding, currency and position are shared by every row.
+    """
+
+    KINDS = ("IBOR", "OVERNIGHT", "FIXED")
+
+    def __init__(
+        self,
+        kind: str,
+        startSerial,
+        endSerial,
+        paymentSerial,
+        accrual,
+        notional,
+        spread,
+        fixedRate,
+        index: Optional[str],
+        compounding: str,
+        currency: str,
+        position: str
+    ) -> None:
+        self.kind = kind.upper()
+        if self.kind not in self.KINDS:
+            raise ValueError(f"Unknown cashflow kind '{kind}', expected one of {self.KINDS}")
+        self.startSerial   = np.asarray(startSerial, dtype=np.int64)
+        self.endSerial     = np.asarray(endSerial, dtype=np.int64)
+        self.paymentSerial = np.asarray(paymentSerial, dtype=np.int64)
+        n = len(self.startSerial)
+        self.accrual   = np.asarray(accrual, dtype=float)
+        self.notional  = np.broadcast_to(np.asarray(notional, dtype=float), (n,))
+        self.spread    = np.broadcast_to(np.asarray(spread, dtype=float), (n,))
+        # the caller's values, handed unchanged to materialized cashflows
+        self.notional_ = notional
+        self.spread_   = spread
+        self.fixedRate = np.broadcast_to(np.asarray(fixedRate, dtype=float), (n,))
+        self.index = index
+        self.compounding = compounding.upper()
+        self.currency = currency
+        self.position = position
+
+    @classmethod
+    def fromSchedule(
+        cls,
+        schedule: pd.DataFrame,
+        iborIndex: Optional[str] = None,
+        overnightIndex: Optional[str] = None,
+        fixedRate: Optional[float] = None,
+        ois_compounding: str = "COMPOUND",
+        ois_spread: float = 0.0,
+        notional: float = 1.0,
+        position: str = "LONG",
+        currency: str = "USD"
+    ) -> "CashflowTable":
+        """Table of a makeSchedule frame; the index (and with it the currency) is looked up once."""
+        if iborIndex:
+            tokenized = iborIndex.split('-')
+            kind, index, spread = "IBOR", iborIndex, 0.0
+            currency = IndexRegistry().get('-'.join(tokenized[:-1]), tokenized[-1]).currency().code()
+        elif overnightIndex:
+            kind, index, spread = "OVERNIGHT", overnightIndex, ois_spread
+            currency = IndexRegistry().get(overnightIndex).currency().code()
+        else:
+            kind, index, spread = "FIXED", None, 0.0
+        start = [Date(d) for d in schedule["StartDate"]]
+        end   = [Date(d) for d in schedule["EndDate"]]
+        return cls(
+            kind,
+            [d.serialNumber() for d in start],
+            [d.serialNumber() for d in end],
+            [Date(d).serialNumber() for d in schedule["PaymentDate"]],
+            [accrued(s, e) for s, e in zip(start, end)],
+            notional,
+            spread,
+            (fixedRate or 0.0) if kind == "FIXED" else 0.0,
+            index,
+            ois_compounding,
+            currency,
+            position,
+        )
+
+    def __len__(self) -> int:
+        return len(self.startSerial)
+
+    @property
+    def amount(self) -> np.ndarray:
+        """Fixed coupon amounts, notional * rate * accrual (zero on floating legs)."""
+        return self.notional * self.fixedRate * self.accrual
+
+    def cashflow(self, i: int) -> Product:
+        """Materializes row i as the cashflow product InterestRateStream used to hold."""
+        start, end, payment = (Date(int(a[i])) for a in (self.startSerial, self.endSerial, self.paymentSerial))
+        notional = self.notional_ if np.ndim(self.notional_) == 0 else self.notional_[i]
+        spread = self.spread_ if np.ndim(self.spread_) == 0 else self.spread_[i]
+        if self.kind == "IBOR":
+            return ProductIborCashflow(start, end, self.index, spread, notional, self.position, payment)
+        if self.kind == "OVERNIGHT":
+            return ProductOvernightIndexCashflow(start, end, self.index, self.compounding, spread, notional, self.position, payment)
+        return ProductBulletCashflow(end, self.currency, float(self.amount[i]), self.position, payment)
+
+    def toFrame(self) -> pd.DataFrame:
+        iso = lambda serials: [Date(int(x)).ISO() for x in serials]
+        return pd.DataFrame({
+            "ACCRUAL START": iso(self.startSerial),
+            "ACCRUAL END":   iso(self.endSerial),
+            "PAYMENT DATE":  iso(self.paymentSerial),
+            "ACCRUAL":       self.accrual,
+            "NOTIONAL":      self.notional,
+            "SPREAD":        self.spread,
+            "FIXED RATE":    self.fixedRate,
+        })
+
 class InterestRateStream(ProductPortfolio):
+    """
+    A leg held as a CashflowTable. The per-cashflow products behind element(i) / elements are
+    only built when asked for; the YC engines value the leg straight from the table.
+    """
+    prodType = "InterestRateStream"
 
     def __init__(
         self,
@@ -318,29 +439,50 @@ class InterestRateStream(ProductPortfolio):
         endOfMonth: bool               = False
     ):
 
-        # calendar    = HolidayConvention(holConv).value
-        # bdc         = BusinessDayConvention(bizConv).value
-        # dayCounter  = AccrualBasis(accrualBasis).value
-
         schedule = makeSchedule(startDate, endDate, frequency, holConv, bizConv, accrualBasis, rule, endOfMonth)
-        prods, weights = [], []
-        for row in schedule.itertuples(index=False):
-            if iborIndex:
-                cf = ProductIborCashflow(Date(row.StartDate), Date(row.EndDate), iborIndex, 0.0, notional, position, Date(row.PaymentDate))
-            elif overnightIndex:
-                cf = ProductOvernightIndexCashflow(Date(row.StartDate), Date(row.EndDate), overnightIndex, ois_compounding, ois_spread, notional, position, Date(row.PaymentDate))
-            else:
-                alpha_i = accrued(Date(row.StartDate), Date(row.EndDate))
-                coupon_amt = notional * (fixedRate or 0.0) * alpha_i
-                cf = ProductBulletCashflow(Date(row.EndDate), currency, coupon_amt, position, Date(row.PaymentDate))
-            prods.append(cf)
-            weights.append(1.0)
+        self._setupPortfolio(len(schedule))
+        self.cashflows = CashflowTable.fromSchedule(schedule, iborIndex, overnightIndex, fixedRate, ois_compounding, ois_spread, notional, position, currency)
+        self.cashflows_: List[Optional[Product]] = [None] * len(self.cashflows)
+
+    @property
+    def numProducts(self):
+        return len(self.cashflows)
+
+    @property
+    def count(self) -> int:
+        return len(self.cashflows)
 
-        super().__init__(prods, weights)
+    def element(self, i: int) -> Product:
+        assert 0 <= i < self.numProducts
+        if self.cashflows_[i] is None:
+            self.cashflows_[i] = self.cashflows.cashflow(i)
+        return self.cashflows_[i]
+
+    @property
+    def elements(self) -> List[Tuple[Product, float]]:
+        return [(self.element(i), 1.0) for i in range(self.numProducts)]
+
+    @property
+    def currency(self) -> Currency:
+        return Currency(self.cashflows.currency)
+
+    @property
+    def longOrShort(self) -> LongOrShort:
+        return LongOrShort(self.cashflows.position)
 
     def cashflow(self, i: int) -> Product:
         return self.element(i)
 
+    def accept(self, visitor: ProductVisitor):
+        """
+        Visitors with a visit_stream method get the leg itself and read its CashflowTable, so no
+        cashflow product is built; any other visitor walks the cashflows as for a portfolio.
+        """
+        visit_stream = getattr(visitor, "visit_stream", None)
+        if visit_stream is not None:
+            return visit_stream(self)
+        return super().accept(visitor)
+
 class ProductIborSwap(Product):
     prodType = "ProductIborSwap"
 
@@ -405,7 +547,7 @@ class ProductIborSwap(Product):
             Date(maturityDate),
             notional,
             position,
-            self.floatingLeg.element(0).currency
+            self.floatingLeg.currency
         )
 
     def floatingLegCashflow(self, i: int) -> Product:
@@ -504,7 +646,7 @@ class ProductOvernightSwap(Product):
             Date(maturityDate),
             notional,
             position,
-            self.floatingLeg.element(0).currency
+            self.floatingLeg.currency
         )
 
     def floatingLegCashflow(self, i: int) -> Product:
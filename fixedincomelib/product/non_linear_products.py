@@ -1,9 +1,11 @@
+import numpy as np
 import pandas as pd
+import QuantLib as ql
 from fixedincomelib.market.basics import AccrualBasis, BusinessDayConvention, HolidayConvention
 from fixedincomelib.product.product import LongOrShort, ProductVisitor, Product
 from fixedincomelib.date import Date, TermOrTerminationDate
 from fixedincomelib.market import IndexRegistry, Currency
-from fixedincomelib.date.utilities import makeSchedule, business_day_schedule
+from fixedincomelib.date.utilities import makeSchedule, business_day_schedule, business_day_serials, accrued
 from fixedincomelib.product.portfolio import ProductPortfolio
 from typing import List, Optional, Union
 from fixedincomelib.product.linear_products import ProductIborSwap,ProductOvernightSwap
@@ -98,11 +100,28 @@ class ProductOvernightCapFloorlet(Product):
         super().__init__(
             self.effDate_, self.endDate_, notional, longOrShort, Currency(ccy_code)
         )
+        self.fixingSerials_ = None
+        self.fixingAccruals_ = None
 
     def get_fixing_schedule(self) -> list[Date]:
         cal = self.oisIndex_.fixingCalendar()
         return business_day_schedule(self.effDate_, self.endDate_, cal)
 
+    @property
+    def fixingSerials(self) -> np.ndarray:
+        """Serial numbers of the daily fixing schedule, shared with every caplet on the same dates."""
+        if self.fixingSerials_ is None:
+            self.fixingSerials_ = business_day_serials(self.effDate_, self.endDate_, self.oisIndex_.fixingCalendar())
+        return self.fixingSerials_
+
+    @property
+    def fixingAccruals(self) -> np.ndarray:
+        """Accrual fraction of each daily fixing period, computed once per caplet."""
+        if self.fixingAccruals_ is None:
+            dates = [Date(ql.Date(int(s))) for s in self.fixingSerials]
+            self.fixingAccruals_ = np.array([accrued(d0, d1) for d0, d1 in zip(dates, dates[1:])], dtype=float)
+        return self.fixingAccruals_
+
     @property
     def optionType(self) -> str:
         return self.optionType_
@@ -281,16 +300,19 @@ class ProductOvernightCapFloor(Product):
             notional, longOrShort,
             self.capStream.element(0).currency
         )
+        self.fixingAccruals_ = None
 
     def get_fixing_schedule(self) -> list[Date]:
-        mgr     = IndexManager.instance()
-        raw     = mgr.get_fixings(self.indexKey_, self.effDate_, self.endDate_)
-        fixing_qldates = sorted(raw.keys())
-        print(f"[ProductOvernightCapFloorlet] index={self.indexKey_}  eff={self.effDate_}  end={self.endDate_}")
-        print(f"    → raw fixings keys: {fixing_qldates!r}")
-        dates = [self.effDate_] + [Date(d) for d in fixing_qldates] + [self.endDate_]
-        print(f"    → final fixing‐schedule: {dates!r}")
-        return dates
+        cal = IndexRegistry().get(self.indexKey_).fixingCalendar()
+        return business_day_schedule(self.firstDate, self.lastDate, cal)
+
+    @property
+    def fixingAccruals(self) -> np.ndarray:
+        """Accrual fraction of each daily fixing period over the whole cap, computed once."""
+        if self.fixingAccruals_ is None:
+            dates = self.get_fixing_schedule()
+            self.fixingAccruals_ = np.array([accrued(d0, d1) for d0, d1 in zip(dates, dates[1:])], dtype=float)
+        return self.fixingAccruals_
 
     @property
     def effectiveDate(self) -> Date:
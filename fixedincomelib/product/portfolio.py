@@ -5,12 +5,15 @@ class ProductPortfolio(Product):
     prodType = "ProductPortfolio"
 
     def __init__(self, products: List[Product], weights: Optional[List[float]] = None):
-        assert products, "Portfolio must contain at least one product"
+        self._setupPortfolio(len(products))
         if weights is None:
             weights = [1.0] * len(products)
         assert len(weights) == len(products), "Weights list must match products list length"
         self.elements: List[Tuple[Product, float]] = list(zip(products, weights))
 
+    def _setupPortfolio(self, numProducts: int) -> None:
+        """Checks a portfolio is non-empty and blanks the single-product attributes; shared with subclasses holding their elements differently."""
+        assert numProducts, "Portfolio must contain at least one product"
         for attr in ("notional", "coupon", "maturity"):
             try:
                 setattr(self, attr, None)
@@ -1,6 +1,7 @@
 import pandas as pd
+from fixedincomelib.date import (Date)
 from fixedincomelib.product.product import (ProductVisitor)
-from fixedincomelib.product.linear_products import (ProductBulletCashflow, ProductFuture, ProductIborCashflow, ProductOvernightIndexCashflow, ProductRfrFuture, ProductIborSwap, ProductOvernightSwap)
+from fixedincomelib.product.linear_products import (ProductBulletCashflow, ProductFuture, ProductIborCashflow, ProductOvernightIndexCashflow, ProductRfrFuture, ProductIborSwap, ProductOvernightSwap, InterestRateStream)
 from fixedincomelib.product.non_linear_products import (ProductIborCapFloorlet, ProductOvernightCapFloorlet, ProductIborCapFloor, ProductOvernightCapFloor, ProductIborSwaption, ProductOvernightSwaption)
 from fixedincomelib.product.portfolio import (ProductPortfolio)
 
@@ -544,4 +545,42 @@ class PortfolioVisitor(ProductVisitor):
             nvp.append([f'Element {idx} Type',   p.prodType])
             nvp.append([f'Element {idx} Weight', w       ])
             
-        return pd.DataFrame(nvp, columns=['Attribute', 'Value'])
\ No newline at end of file
+        return pd.DataFrame(nvp, columns=['Attribute', 'Value'])
+
+class InterestRateStreamVisitor(ProductVisitor):
+
+    def visit_stream(self, prod: InterestRateStream) -> pd.DataFrame:
+        # read off the CashflowTable: no cashflow product is built
+        table = prod.cashflows
+
+        nvp = []
+
+        this_row = ['NumCashflows']
+        this_row.append(len(table))
+        nvp.append(this_row)
+
+        this_row = ['Kind']
+        this_row.append(table.kind)
+        nvp.append(this_row)
+
+        this_row = ['Index']
+        this_row.append(table.index)
+        nvp.append(this_row)
+
+        this_row = ['FirstAccrualStart']
+        this_row.append(Date(int(table.startSerial[0])).ISO())
+        nvp.append(this_row)
+
+        this_row = ['LastAccrualEnd']
+        this_row.append(Date(int(table.endSerial[-1])).ISO())
+        nvp.append(this_row)
+
+        this_row = ['Currency']
+        this_row.append(prod.currency.value.code())
+        nvp.append(this_row)
+
+        this_row = ['LongOrShort']
+        this_row.append(prod.longOrShort.valueStr)
+        nvp.append(this_row)
+
+        return pd.DataFrame(nvp, columns=['Attribute', 'Value'])
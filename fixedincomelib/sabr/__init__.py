@@ -1,2 +1,4 @@
 from fixedincomelib.sabr.sabr_model import (SabrModel,SabrModelComponent)
-from fixedincomelib.sabr.valuation_engine_sabr import (ValuationEngineRegistry, ValuationEngineIborCapFloor, ValuationEngineIborCapFloorlet, ValuationEngineIborSwaption, ValuationEngineOvernightCapFloor, ValuationEngineOvernightCapFloorlet, ValuationEngineOvernightSwaption)
\ No newline at end of file
+from fixedincomelib.sabr.valuation_engine_sabr import (ValuationEngineRegistry, ValuationEngineIborCapFloor, ValuationEngineIborCapFloorlet, ValuationEngineIborSwaption, ValuationEngineOvernightCapFloor, ValuationEngineOvernightCapFloorlet, ValuationEngineOvernightSwaption)
+from fixedincomelib.sabr.sabr_calibration import (SabrSmileCalibrator, fit_smile)
+from fixedincomelib.sabr.caplet_stripping import (CapletStripper)
\ No newline at end of file
@@ -0,0 +1,190 @@
+from typing import Optional, Sequence, Union
+import numpy as np
+import pandas as pd
+from fixedincomelib.data import Data2D
+from fixedincomelib.date import Date, TermOrTerminationDate
+from fixedincomelib.date.utilities import accrued, addPeriod
+from fixedincomelib.product import ProductIborCapFloor, ProductOvernightCapFloor
+from fixedincomelib.analytics.implied_vol import normal_prices
+from fixedincomelib.utilities import simple_solver
+from fixedincomelib.yield_curve import YieldCurve
+
+class CapletStripper:
+    """
+    Bootstraps caplet normal vols from cap/floor quotes on a common schedule.
+
+    Caps are sorted by maturity; the caplets a cap adds over the previous (shorter) one share a
+    single unknown normal vol. The PV of the caplets already stripped is carried forward, so each
+    step only prices its new caplets: cap PV - carried PV = sum of new caplet PVs(vol).
+    Quotes may carry several strikes per maturity (strikes: (n_maturities, n_strikes)); each strike
+    column is solved in the same array-mode simple_solver call. When a column's strike moves
+    between maturities (e.g. ATM caps) the carried PV is repriced at the new strike in one batch.
+
+    quotes are flat normal vols (quoteType="FLATVOL") or PVs per unit notional of a long position
+    (quoteType="PRICE"). Caplets are Bachelier priced off the yield curve, as the SABR engines do.
+    """
+
+    QUOTE_TYPES = ("FLATVOL", "PRICE")
+
+    def __init__(
+        self,
+        yieldCurve: YieldCurve,
+        index: str,
+        effectiveDate: Union[str, Date],
+        maturities: Sequence[Union[str, Date]],  # terms ("2Y") or termination dates
+        frequency: str,
+        strikes,
+        quotes,
+        quoteType: str = "FLATVOL",
+        optionType: str = "CAP",
+        compounding: str = "COMPOUND",
+        **schedule,
+    ) -> None:
+        self.yieldCurve = yieldCurve
+        self.index = index
+        self.quoteType = quoteType.upper()
+        if self.quoteType not in self.QUOTE_TYPES:
+            raise ValueError(f"Unknown quote type '{quoteType}', expected one of {self.QUOTE_TYPES}")
+        self.optionType = optionType.upper()
+        self.isCall = self.optionType == "CAP"
+
+        strikes = np.asarray(strikes, dtype=float)
+        quotes = np.asarray(quotes, dtype=float)
+        self.strikes = strikes.reshape(len(maturities), -1)
+        self.quotes = quotes.reshape(self.strikes.shape)
+
+        # the caps only serve to lay out the caplet schedules; rolling forward from the common
+        # effective date keeps every shorter cap's schedule a prefix of the longer ones
+        schedule.setdefault("rule", "FORWARD")
+        isOIS = yieldCurve.retrieveComponent(index).isOvernightIndex
+        caps = []
+        for maturity in maturities:
+            to = TermOrTerminationDate(maturity)
+            if to.isTerm():
+                maturity = addPeriod(effectiveDate, maturity, schedule.get("bizConv", "MF"), schedule.get("holConv", "TARGET"), schedule.get("endOfMonth", False))
+            if isOIS:
+                cap = ProductOvernightCapFloor(effectiveDate, maturity, frequency, index, compounding, self.optionType, 0.0, 1.0, "LONG", **schedule)
+            else:
+                cap = ProductIborCapFloor(effectiveDate, maturity, frequency, index, self.optionType, 0.0, 1.0, "LONG", **schedule)
+            caps.append(cap)
+        order = np.argsort([cap.maturityDate.serialNumber() for cap in caps], kind="stable")
+        self.caps = [caps[i] for i in order]
+        self.strikes = self.strikes[order]
+        self.quotes = self.quotes[order]
+
+        # union of caplets keyed by accrual dates; each cap must extend the previous one
+        caplets, keys, self.capSize = [], {}, []
+        for cap in self.caps:
+            periods = [(c.firstDate.serialNumber(), c.lastDate.serialNumber()) for c in cap.capStream.products]
+            if periods[:len(keys)] != list(keys):
+                raise ValueError(f"Cap maturing {cap.maturityDate.ISO()} does not extend the shorter caps' schedule")
+            for period, caplet in zip(periods[len(keys):], cap.capStream.products[len(keys):]):
+                keys[period] = len(caplets)
+                caplets.append(caplet)
+            self.capSize.append(len(periods))
+        self.caplets = caplets
+
+        valueDate = yieldCurve.valueDate
+        n = len(caplets)
+        self.expiry = np.empty(n)
+        self.tenor = np.empty(n)
+        self.forward = np.empty(n)
+        self.discountFactor = np.empty(n)
+        for i, c in enumerate(caplets):
+            self.expiry[i] = accrued(valueDate, c.firstDate)
+            self.tenor[i] = accrued(c.firstDate, c.lastDate)
+            self.forward[i] = yieldCurve.forward(index, c.firstDate, c.lastDate)
+            self.discountFactor[i] = yieldCurve.discountFactor(index, c.lastDate)
+        # PV of a unit notional caplet per unit of undiscounted premium
+        self.weight = self.discountFactor * self.tenor
+
+        self.capletVols_: Optional[np.ndarray] = None
+        self.capletValues_: Optional[np.ndarray] = None
+
+    def _caplet_pvs(self, rows: slice, strikes: np.ndarray, vols: np.ndarray) -> np.ndarray:
+        """(caplets in rows) x (strike columns) PVs, one batched Bachelier call."""
+        price, _ = normal_prices(
+            strikes[None, :],
+            self.forward[rows, None],
+            np.maximum(self.expiry[rows, None], 0.0),
+            vols,
+            self.isCall,
+        )
+        return self.weight[rows, None] * price
+
+    def targetValues(self) -> np.ndarray:
+        """Cap PVs per unit notional, (n_maturities, n_strikes)."""
+        if self.quoteType == "PRICE":
+            return self.quotes.copy()
+        targets = np.empty(self.quotes.shape)
+        for j, size in enumerate(self.capSize):
+            targets[j] = self._caplet_pvs(slice(0, size), self.strikes[j], np.broadcast_to(self.quotes[j], (size, self.quotes.shape[1]))).sum(axis=0)
+        return targets
+
+    def strip(self, tolerance: float = 1e-12, max_iter: int = 50) -> np.ndarray:
+        """Solves the caplet normal vols, (n_caplets, n_strikes); caplet j keeps its cap's strikes."""
+        targets = self.targetValues()
+        n, m = len(self.caplets), self.strikes.shape[1]
+        vols = np.zeros((n, m))
+        values = np.zeros((n, m))
+
+        carried = np.zeros(m)
+        done = 0
+        for j, size in enumerate(self.capSize):
+            strikes = self.strikes[j]
+            if j > 0 and done > 0:
+                moved = strikes != self.strikes[j - 1]
+                if np.any(moved):
+                    # only columns whose strike changed are repriced, the others carry over
+                    repriced = self._caplet_pvs(slice(0, done), strikes, vols[:done]).sum(axis=0)
+                    carried = np.where(moved, repriced, carried)
+            if size == done:
+                continue
+
+            new = slice(done, size)
+            residual = lambda sigma: self._caplet_pvs(new, strikes, np.broadcast_to(sigma, (size - done, m))).sum(axis=0) - (targets[j] - carried)
+            guess = self.quotes[j] if self.quoteType == "FLATVOL" else (vols[done - 1] if done > 0 else np.full(m, 0.01))
+            sigma = simple_solver(residual, 0.9 * guess, guess, tolerance=tolerance, max_iter=max_iter)
+
+            vols[new] = sigma
+            values[new] = self._caplet_pvs(new, strikes, vols[new])
+            carried = carried + values[new].sum(axis=0)
+            done = size
+
+        self.capletVols_ = vols
+        self.capletValues_ = values
+        return vols
+
+    def capletVols(self) -> pd.DataFrame:
+        """
+        Stripped caplets in the smile format of SabrSmileCalibrator: one row per caplet and
+        strike column with EXPIRY, TENOR, FORWARD, STRIKE, NORMALVOL.
+        """
+        if self.capletVols_ is None:
+            self.strip()
+        capStrikes = np.repeat(self.strikes, np.diff([0] + self.capSize), axis=0)
+        m = self.strikes.shape[1]
+        return pd.DataFrame({
+            "EXPIRY":    np.repeat(self.expiry, m),
+            "TENOR":     np.repeat(self.tenor, m),
+            "FORWARD":   np.repeat(self.forward, m),
+            "STRIKE":    capStrikes.ravel(),
+            "NORMALVOL": self.capletVols_.ravel(),
+        })
+
+    def toData2D(self, data_type: str = "normalvol", strikeColumn: int = 0) -> Data2D:
+        """
+        One strike column of the stripped vols as a (caplet expiry x caplet tenor) Data2D for
+        SabrModelComponent, e.g. the ATM column as the NORMALVOL grid. Caplets that have already
+        fixed (expiry <= 0) carry no vol information and are left out; the tenor axis is the
+        median caplet accrual, so the grid is flat in tenor.
+        """
+        if self.capletVols_ is None:
+            self.strip()
+        live = self.expiry > 0.0
+        grid = pd.DataFrame(
+            self.capletVols_[live, strikeColumn][:, None],
+            index=self.expiry[live].tolist(),
+            columns=[float(np.median(self.tenor))],
+        )
+        return Data2D.createDataObject(data_type, self.index, grid)
@@ -0,0 +1,142 @@
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+from scipy.optimize import least_squares
+from fixedincomelib.analytics import sabr_kernel
+from fixedincomelib.analytics.implied_vol import normal_prices
+from fixedincomelib.data import Data2D
+
+def fit_smile(
+    forward: float,
+    expiry: float,
+    strikes,
+    normal_vols,
+    shift: float = 0.0,
+    beta: Optional[float] = None,
+    initial: Tuple[float, float, float] = (0.5, 0.3, 0.0),
+) -> Dict[str, float]:
+    """
+    Fits one normal vol smile with the Hagan SABR expansion, in the same conventions as
+    SABRCalculator (pysabr f = forward + shift, k = strike + shift). NORMALVOL is the market ATM
+    normal vol (interpolated in strike when ATM is not quoted), which pins alpha; beta, nu and rho
+    minimise the vega-weighted price errors, i.e. approximately the normal vol errors, of the
+    out-of-the-money options. Pass beta to hold it fixed.
+    Returns {NORMALVOL, BETA, NU, RHO, RMSE} with RMSE in normal vol units.
+    """
+    strikes = np.asarray(strikes, dtype=float)
+    normal_vols = np.asarray(normal_vols, dtype=float)
+    order = np.argsort(strikes)
+    strikes, normal_vols = strikes[order], normal_vols[order]
+    v_atm_n = float(np.interp(forward, strikes, normal_vols))
+
+    is_call = strikes >= forward
+    market, vega = normal_prices(strikes, forward, expiry, normal_vols, is_call)
+    vega = np.maximum(vega, 1e-12)
+    f, k = forward + shift, strikes + shift
+
+    def unpack(x):
+        if beta is None:
+            return x[0], x[1], x[2]
+        return beta, x[0], x[1]
+
+    def residuals(x):
+        b, nu, rho = unpack(x)
+        model, _ = sabr_kernel.hagan_prices(k, f, shift, expiry, v_atm_n, b, rho, nu, is_call)
+        return (model - market) / vega
+
+    b0, nu0, rho0 = initial
+    if beta is None:
+        x0, lower, upper = [b0, nu0, rho0], [0.0, 1e-4, -0.999], [1.0, 5.0, 0.999]
+    else:
+        x0, lower, upper = [nu0, rho0], [1e-4, -0.999], [5.0, 0.999]
+    fit = least_squares(residuals, x0, bounds=(lower, upper), x_scale="jac", ftol=1e-12, xtol=1e-12, gtol=1e-12)
+
+    b, nu, rho = unpack(fit.x)
+    return {
+        "NORMALVOL": v_atm_n,
+        "BETA": float(b),
+        "NU": float(nu),
+        "RHO": float(rho),
+        "RMSE": float(np.sqrt(np.mean(fit.fun**2))),
+    }
+
+def _fit_smile_task(args):
+    """Process pool entry point: one (expiry, tenor) smile."""
+    expiry, tenor, forward, strikes, vols, shift, beta, initial = args
+    return expiry, tenor, fit_smile(forward, expiry, strikes, vols, shift=shift, beta=beta, initial=initial)
+
+class SabrSmileCalibrator:
+    """
+    Fits SABR to market normal vol smiles quoted per (expiry, tenor) and returns the parameter
+    grids as Data2D objects ("normalvol", "beta", "nu", "rho"), ready for a DataCollection
+    consumed by SabrModel. Smiles are independent, so they are fitted in a process pool.
+
+    smiles: DataFrame with columns EXPIRY, TENOR, FORWARD, STRIKE, NORMALVOL (one row per quote)
+    """
+
+    PARAMETERS = ["NORMALVOL", "BETA", "NU", "RHO"]
+
+    def __init__(
+        self,
+        index: str,
+        shift: float = 0.0,
+        beta: Optional[float] = None,
+        initial: Tuple[float, float, float] = (0.5, 0.3, 0.0),
+        max_workers: Optional[int] = None,
+    ) -> None:
+        self.index = index
+        self.shift = float(shift)
+        self.beta = beta
+        self.initial = tuple(initial)
+        # max_workers=1 fits in process, which is also what a single smile does
+        self.max_workers = max_workers
+        self.results_: Optional[pd.DataFrame] = None
+
+    def _tasks(self, smiles: pd.DataFrame) -> List[tuple]:
+        required = {"EXPIRY", "TENOR", "FORWARD", "STRIKE", "NORMALVOL"}
+        missing = required - set(smiles.columns)
+        if missing:
+            raise ValueError(f"Smile quotes are missing columns {sorted(missing)}")
+        tasks = []
+        for (expiry, tenor), quotes in smiles.groupby(["EXPIRY", "TENOR"], sort=True):
+            forwards = quotes["FORWARD"].unique()
+            if len(forwards) != 1:
+                raise ValueError(f"Smile ({expiry}, {tenor}) has more than one forward")
+            tasks.append((
+                float(expiry), float(tenor), float(forwards[0]),
+                quotes["STRIKE"].to_numpy(dtype=float), quotes["NORMALVOL"].to_numpy(dtype=float),
+                self.shift, self.beta, self.initial,
+            ))
+        return tasks
+
+    def fit(self, smiles: pd.DataFrame) -> pd.DataFrame:
+        """Fits every smile; returns one row per (EXPIRY, TENOR) with the fitted parameters and RMSE."""
+        tasks = self._tasks(smiles)
+        if self.max_workers == 1 or len(tasks) <= 1:
+            fitted = [_fit_smile_task(task) for task in tasks]
+        else:
+            with ProcessPoolExecutor(max_workers=self.max_workers) as pool:
+                fitted = list(pool.map(_fit_smile_task, tasks))
+        self.results_ = pd.DataFrame(
+            [{"EXPIRY": e, "TENOR": t, **params} for e, t, params in fitted]
+        )
+        return self.results_
+
+    def calibrate(self, smiles: pd.DataFrame) -> List[Data2D]:
+        """
+        Fits the smiles and lays the parameters out on the (expiry x tenor) grid. Every node of
+        the grid spanned by the quoted expiries and tenors needs a smile.
+        """
+        results = self.fit(smiles)
+        expiries = np.sort(results["EXPIRY"].unique())
+        tenors = np.sort(results["TENOR"].unique())
+        if len(results) != len(expiries) * len(tenors):
+            raise ValueError(
+                f"Smiles cover {len(results)} of the {len(expiries)} x {len(tenors)} (expiry, tenor) nodes"
+            )
+        data = []
+        for param in self.PARAMETERS:
+            grid = results.pivot(index="EXPIRY", columns="TENOR", values=param).loc[expiries, tenors]
+            data.append(Data2D.createDataObject(param.lower(), self.index, grid))
+        return data
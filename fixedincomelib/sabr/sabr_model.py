@@ -1,4 +1,6 @@
 import math
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
 from typing import Any, Dict, List, Tuple
 import numpy as np
 import pandas as pd
@@ -6,7 +8,19 @@ from fixedincomelib.model.model import Model, ModelComponent
 from fixedincomelib.date import Date
 from fixedincomelib.utilities.numerics import Interpolator2D
 from fixedincomelib.yield_curve import YieldCurve
-from fixedincomelib.data import DataCollection, Data2D, Data1D
+from fixedincomelib.data import DataCollection, Data2D, build_yc_data_collection
+
+def _calibrated_curve_states(valueDate: str, dataCollection: DataCollection, buildMethod: Dict[str, Any]) -> Dict[str, List[float]]:
+    """Process pool entry point of SabrModel.from_data: calibrates one curve component."""
+    return YieldCurve(valueDate, dataCollection, [buildMethod]).calibratedStates()
+
+class _CurveInCalibration:
+    """Stands in for the yield curve while SabrModel.from_data calibrates it in worker processes."""
+
+    def __getattr__(self, name: str):
+        if name.startswith("__"):
+            raise AttributeError(name)
+        raise RuntimeError(f"The yield curve is still being calibrated, '{name}' is not available yet")
 
 class SabrModel(Model):
     MODEL_TYPE = "IR_SABR"
@@ -17,6 +31,7 @@ class SabrModel(Model):
         dataCollection: DataCollection,
         buildMethodCollection: List[Dict[str, Any]],
         ycModel: YieldCurve,
+        cacheSize: int = 4096,
     ):
         for bm in buildMethodCollection:
             tgt  = bm["TARGET"]
@@ -24,6 +39,20 @@ class SabrModel(Model):
             prod = bm.get("PRODUCT")
             bm["NAME"] = f"{tgt}-{vals}" + (f"-{prod}" if prod else "")
 
+        # (index, product_type) -> (parameter components, stacked interpolator or None)
+        self._parameterStacks: Dict[Tuple[str, str], Tuple[List["SabrModelComponent"], Any]] = {}
+
+        # bounded LRU of scalar get_sabr_parameters lookups, keyed on the exact expiry/tenor
+        self.cacheSize_ = int(cacheSize)
+        self._cache: "OrderedDict[tuple, tuple]" = OrderedDict()
+        self._cacheHits = 0
+        self._cacheMisses = 0
+        self.stateVersion_ = 0
+
+        # (index, method, product_type, kernel) or ("CORR", index) -> SABRCalculator / CorrSurface,
+        # see analytics.sabr_calculator._shared
+        self._sharedCalculators: Dict[tuple, Any] = {}
+
         super().__init__(valueDate, self.MODEL_TYPE, dataCollection, buildMethodCollection)
         self._subModel = ycModel
 
@@ -33,9 +62,10 @@ class SabrModel(Model):
         valueDate: str,
         dataCollection: DataCollection,
         buildMethodCollection: List[Dict[str, Any]],
-        ycModel: YieldCurve
+        ycModel: YieldCurve,
+        **kwargs
     ) -> "SabrModel":
-        return cls(valueDate, dataCollection, buildMethodCollection, ycModel)
+        return cls(valueDate, dataCollection, buildMethodCollection, ycModel, **kwargs)
 
     @classmethod
     def from_data(
@@ -43,24 +73,44 @@ class SabrModel(Model):
         valueDate: str,
         dataCollection: DataCollection,
         buildMethodCollection: List[Dict[str, Any]],
-        ycData: DataCollection,
-        ycBuildMethods: List[Dict[str, Any]]
+        ycData: DataCollection | pd.DataFrame,
+        ycBuildMethods: List[Dict[str, Any]],
+        max_workers: int | None = None,
+        warm: bool = False,
+        **kwargs
     ) -> "SabrModel":
-        zero_curves = []
-        for idx_name, sub in ycData.groupby("INDEX"):
-            d1 = Data1D.createDataObject(
-                data_type="zero_rate",
-                data_convention=idx_name,
-                df=sub[["AXIS1", "VALUES"]]
-            )
-            zero_curves.append(d1)
-        yc_dc = DataCollection(zero_curves)
+        """
+        Builds the yield curve from ycData and the SABR model on top of it. ycData is the curve's
+        DataCollection or its market quotes (DATA TYPE, DATA CONVENTION, AXIS, VALUE, as read by
+        build_yc_data_collection); ycBuildMethods name each target's INSTRUMENTS.
+        Each curve build method is calibrated in its own process (curve components are
+        self-funded, so they calibrate independently) while the SABR model is set up, and with
+        warm=True its grids loaded, in this process. The calibrated states are then installed into
+        one YieldCurve without re-solving. max_workers == 1 or a single curve builds everything
+        serially.
+        """
+        # YieldCurve calibrates to market instruments: quotes are read as build_yc_data_collection does
+        yc_dc = ycData if isinstance(ycData, DataCollection) else build_yc_data_collection(ycData)[1]
 
-        yc = YieldCurve(valueDate, yc_dc, ycBuildMethods)
-        return cls(valueDate, dataCollection, buildMethodCollection, yc)
+        if max_workers == 1 or len(ycBuildMethods) <= 1:
+            yc = YieldCurve(valueDate, yc_dc, ycBuildMethods)
+            model = cls(valueDate, dataCollection, buildMethodCollection, yc, **kwargs)
+            return model.warm() if warm else model
+
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            futures = [pool.submit(_calibrated_curve_states, valueDate, yc_dc, bm) for bm in ycBuildMethods]
+            # the SABR grids do not depend on the curve, which is installed once the workers finish
+            model = cls(valueDate, dataCollection, buildMethodCollection, _CurveInCalibration(), **kwargs)
+            if warm:
+                model.warm()
+            states = {}
+            for future in futures:
+                states.update(future.result())
+        model._subModel = YieldCurve(valueDate, yc_dc, ycBuildMethods, calibratedStates=states)
+        return model
 
     def newModelComponent(self, build_method: Dict[str, Any]) -> ModelComponent:
-        return SabrModelComponent(self.valueDate, self.dataCollection, build_method)
+        return SabrModelComponent(self.valueDate, self.dataCollection, build_method, parent_model=self)
 
     def get_sabr_parameters(
         self,
@@ -69,17 +119,182 @@ class SabrModel(Model):
         tenor: float,
         product_type: str | None = None
     ) -> Tuple[float, float, float, float, float, float]:
-        suffix = f"-{product_type}".upper() if product_type else ""
-        params = []
+        """
+        Returns (normal_vol, beta, nu, rho, shift, vol_decay_speed). expiry and tenor may be
+        arrays, in which case the four grid parameters come back as arrays.
+        Scalar lookups go through a bounded LRU cache keyed on the exact (expiry, tenor), so a
+        hit returns what the interpolation gives for those inputs, see cache_info().
+        """
+        if self.cacheSize_ <= 0 or np.ndim(expiry) > 0 or np.ndim(tenor) > 0:
+            return self._lookup_sabr_parameters(index, expiry, tenor, product_type)
+
+        key = (str(index).upper(), str(product_type).upper() if product_type else "",
+               float(expiry), float(tenor))
+        cached = self._cache.get(key)
+        if cached is not None:
+            self._cache.move_to_end(key)
+            self._cacheHits += 1
+            return cached
+
+        self._cacheMisses += 1
+        result = self._lookup_sabr_parameters(index, key[2], key[3], product_type)
+        self._cache[key] = result
+        if len(self._cache) > self.cacheSize_:
+            self._cache.popitem(last=False)
+        return result
+
+    def _lookup_sabr_parameters(self, index, expiry, tenor, product_type):
+        comps, stacked = self._parameterStack(index, product_type)
+        if stacked is not None:
+            values = stacked.interpolate(expiry, tenor)
+            params = [values[..., k] for k in range(len(self.PARAMETERS))]
+            if np.ndim(values) == 1:
+                params = [float(p) for p in params]
+        else:
+            params = [comp.interpolate(expiry, tenor) for comp in comps]
+        nv_comp = comps[0]
+        return (*params, nv_comp.shift, nv_comp.vol_decay_speed)
+
+    def _parameterStack(self, index: str, product_type: str | None):
+        """
+        Components for PARAMETERS of (index, product_type), plus one Interpolator2D over the
+        stacked (expiry x tenor x parameter) grid when all of them share the same axes.
+        """
+        group = (str(index).upper(), str(product_type).upper() if product_type else "")
+        stack = self._parameterStacks.get(group)
+        if stack is not None:
+            return stack
+
+        suffix = f"-{group[1]}" if group[1] else ""
+        comps = []
         for p in self.PARAMETERS:
-            key = f"{index}-{p}{suffix}".upper()
+            key = f"{group[0]}-{p}{suffix}"
             comp = self.components.get(key)
             if comp is None:
                 raise KeyError(f"No SABR component found for {key}")
-            params.append(comp.interpolate(expiry, tenor))
-        nv_key = f"{index}-NORMALVOL{suffix}".upper()
-        nv_comp = self.components[nv_key]
-        return (*params, nv_comp.shift, nv_comp.vol_decay_speed)
+            comps.append(comp)
+
+        first = comps[0]
+        shared = all(
+            np.array_equal(c.axis1, first.axis1) and np.array_equal(c.axis2, first.axis2)
+            for c in comps[1:]
+        )
+        stacked = None
+        if shared:
+            stacked = Interpolator2D(
+                axis1=first.axis1,
+                axis2=first.axis2,
+                values=np.stack([c.grid for c in comps], axis=-1),
+                method="LINEAR",
+                memo=True
+            )
+        stack = (comps, stacked)
+        self._parameterStacks[group] = stack
+        return stack
+
+    def bucketSensitivities(
+        self,
+        index: str,
+        expiry,
+        tenor,
+        sensitivities: Dict[str, Any],
+        product_type: str | None = None,
+        buckets: Dict[str, np.ndarray] | None = None
+    ) -> Dict[str, np.ndarray]:
+        """
+        Attributes per-option sensitivities to the SABR parameters (keyed by PARAMETERS, arrays
+        broadcasting against expiry/tenor) to the nodes of each parameter's grid. Interpolation is
+        bilinear, so dPV/dnode = sum over options of dPV/dparameter * bilinear weight of the node.
+        Returns {component name: (len(axis1), len(axis2)) array}; pass buckets to accumulate into.
+        """
+        comps, _ = self._parameterStack(index, product_type)
+        buckets = {} if buckets is None else buckets
+        for param, comp in zip(self.PARAMETERS, comps):
+            if param not in sensitivities:
+                continue
+            indices, weights = comp.interpolator.weights(expiry, tenor)
+            sens = np.broadcast_to(np.asarray(sensitivities[param], dtype=float), indices.shape[:-1])
+            key = comp.buildMethod_["NAME"].upper()
+            nodes = buckets.get(key)
+            if nodes is None:
+                nodes = buckets[key] = np.zeros((len(comp.axis1), len(comp.axis2)))
+            np.add.at(nodes.reshape(-1), indices.reshape(-1), (sens[..., None] * weights).reshape(-1))
+        return buckets
+
+    def smile_surface(
+        self,
+        index: str,
+        tenor: float,
+        expiries,
+        strikes_or_moneyness,
+        moneyness: bool = False,
+        forwards=None,
+        method: str | None = None,
+        product_type: str | None = None,
+        kernel: str = "vectorized"
+    ) -> Dict[str, np.ndarray]:
+        """
+        Vols and prices on an (expiry x strike) grid, see SABRCalculator.smile_surface.
+        method is None (plain Hagan) or "top-down"; top-down reads the CAPLET grids by default.
+        kernel "pde" prices with the arbitrage-free SABR PDE instead of Hagan's expansion.
+        Default forwards come from the discount curve, an approximation for IBOR indices.
+        """
+        # fixedincomelib.analytics imports this module, so the calculator is imported on use
+        from fixedincomelib.analytics.sabr_calculator import SABRCalculator
+        if product_type is None and method is not None and method.lower() == "top-down":
+            product_type = "CAPLET"
+        calc = SABRCalculator.shared(self, index, method=method, product_type=product_type, kernel=kernel)
+        return calc.smile_surface(index, tenor, expiries, strikes_or_moneyness, moneyness=moneyness, forwards=forwards)
+
+    def warm(self, indices: List[str] | None = None) -> "SabrModel":
+        """
+        Builds the components of indices (all by default) and their stacked interpolators now
+        rather than on first get_sabr_parameters, e.g. at the start of a long-running service.
+        """
+        wanted = None if indices is None else {str(i).upper() for i in indices}
+        groups = set()
+        for comp in self.components.values():
+            index = str(comp.target).upper()
+            if wanted is not None and index not in wanted:
+                continue
+            comp.materialize()
+            if comp.buildMethod_["VALUES"].upper() in self.PARAMETERS:
+                groups.add((index, comp.product_type))
+        for index, product_type in groups:
+            try:
+                self._parameterStack(index, product_type)
+            except KeyError:
+                # incomplete parameter set: get_sabr_parameters raises for it on use, as before
+                pass
+        return self
+
+    def materialized(self) -> Dict[str, bool]:
+        """Component name -> whether its grid has been built."""
+        return {name: comp.isMaterialized for name, comp in self.components.items()}
+
+    def onComponentChanged(self) -> None:
+        """Called by components after (re)calibration or perturbation: drops all derived state."""
+        self._parameterStacks.clear()
+        self._cache.clear()
+        self._sharedCalculators.clear()
+        self.stateVersion_ += 1
+
+    def cache_info(self) -> Dict[str, int]:
+        return {
+            "hits": self._cacheHits,
+            "misses": self._cacheMisses,
+            "size": len(self._cache),
+            "maxsize": self.cacheSize_,
+        }
+
+    def clear_cache(self) -> None:
+        self._cache.clear()
+        self._cacheHits = 0
+        self._cacheMisses = 0
+
+    @property
+    def stateVersion(self) -> int:
+        return self.stateVersion_
     
     def jacobian(self):
         """
@@ -93,38 +308,93 @@ class SabrModel(Model):
         return self._subModel
     
 class SabrModelComponent(ModelComponent):
+    """
+    One SABR parameter grid. The grid and its interpolator are built on first use (axis1, axis2,
+    grid, interpolator, interpolate, perturbation), so a model pays only for the indices it prices;
+    see SabrModel.warm() to build everything upfront.
+    """
 
     def __init__(
         self,
         valueDate: Date,
         dataCollection: DataCollection,
-        buildMethod: Dict[str, Any]
+        buildMethod: Dict[str, Any],
+        parent_model: SabrModel | None = None
     ) -> None:
         
         super().__init__(valueDate, dataCollection, buildMethod)
+        self._model = parent_model
         self.shift           = float(buildMethod.get("SHIFT", 0.0))
         self.vol_decay_speed = float(buildMethod.get("VOL_DECAY_SPEED", 0.0))
         self.product_type    = buildMethod.get("PRODUCT")
-        self.calibrate()
+        self.axis1_ = None
+        self.axis2_ = None
+        self.grid_ = None
+        self.interp2d_ = None
 
     def calibrate(self) -> None:
+        self._loadGrid()
+        self._installGrid()
+
+    def _loadGrid(self) -> None:
 
         param = self.buildMethod_["VALUES"]  
 
         md = self.dataCollection.get(param.lower(), self.target_)
         assert isinstance(md, Data2D)
 
-        self.axis1 = np.array(md.axis1, dtype=float)  
-        self.axis2 = np.array(md.axis2, dtype=float)   
-        self.grid  = md.values                         
+        self.axis1_ = np.array(md.axis1, dtype=float)  
+        self.axis2_ = np.array(md.axis2, dtype=float)   
+        # state variables are the grid nodes, row-major over (axis1, axis2)
+        self.stateVars_ = [float(v) for v in np.ravel(md.values)]
 
+    def _installGrid(self, notify: bool = True) -> None:
+        self.grid_ = np.array(self.stateVars_, dtype=float).reshape(len(self.axis1_), len(self.axis2_))
         method = self.buildMethod_.get("INTERPOLATION", "LINEAR")
-        self._interp2d = Interpolator2D(
-            axis1=self.axis1,
-            axis2=self.axis2,
-            values=self.grid,
-            method=method
+        self.interp2d_ = Interpolator2D(
+            axis1=self.axis1_,
+            axis2=self.axis2_,
+            values=self.grid_,
+            method=method,
+            memo=True
         )
+        if notify and self._model is not None:
+            self._model.onComponentChanged()
+
+    def materialize(self) -> "SabrModelComponent":
+        """
+        Builds the grid on first use. Nothing derived from it exists yet, so unlike calibrate()
+        this does not notify the model (cached lookups of other components stay valid).
+        """
+        if self.interp2d_ is None:
+            self._loadGrid()
+            self._installGrid(notify=False)
+        return self
+
+    @property
+    def isMaterialized(self) -> bool:
+        return self.interp2d_ is not None
+
+    @property
+    def axis1(self) -> np.ndarray:
+        return self.materialize().axis1_
+
+    @property
+    def axis2(self) -> np.ndarray:
+        return self.materialize().axis2_
+
+    @property
+    def grid(self) -> np.ndarray:
+        return self.materialize().grid_
+
+    @property
+    def interpolator(self) -> Interpolator2D:
+        return self.materialize().interp2d_
+
+    def perturbModelParameter(self, state_var_index: int, perturb_size: float) -> None:
+        self.materialize()
+        super().perturbModelParameter(state_var_index, perturb_size)
+        self._installGrid()
 
-    def interpolate(self, expiry: float, tenor: float) -> float:
-        return self._interp2d.interpolate(expiry, tenor)
\ No newline at end of file
+    def interpolate(self, expiry, tenor):
+        return self.interpolator.interpolate(expiry, tenor)
@@ -1,4 +1,7 @@
 from typing import Any, Dict
+import weakref
+import numpy as np
+import pandas as pd
 from fixedincomelib.sabr import SabrModel
 from fixedincomelib.analytics import SABRCalculator
 from fixedincomelib.valuation import (ValuationEngine, ValuationEngineRegistry, IndexManager)
@@ -6,6 +9,10 @@ from fixedincomelib.product import (LongOrShort, ProductIborCapFloorlet, Product
 from fixedincomelib.date.utilities import accrued
 import warnings
 
+# SABR_KERNEL when valuation_parameters has none, the same for every engine so a caplet prices
+# through the same code alone and inside a cap (see SABRCalculator.KERNELS)
+DEFAULT_SABR_KERNEL = "vectorized"
+
 class ValuationEngineIborCapFloorlet(ValuationEngine):
 
     def __init__(self, model: SabrModel, valuation_parameters: Dict[str, Any], product: ProductIborCapFloorlet) -> None:
@@ -19,7 +26,7 @@ class ValuationEngineIborCapFloorlet(ValuationEngine):
                 "forcing standard Hagan SABR.",
                 UserWarning
             )
-        self.sabrCalc = SABRCalculator(model, method=None)
+        self.sabrCalc = SABRCalculator.shared(model, product.index, kernel=valuation_parameters.get("SABR_KERNEL", DEFAULT_SABR_KERNEL))
         self.currencyCode = product.currency.value.code()
         self.accrualStart = product.accrualStart
         self.accrualEnd   = product.accrualEnd
@@ -28,7 +35,8 @@ class ValuationEngineIborCapFloorlet(ValuationEngine):
         self.notional     = product.notional
         self.buyOrSell    = 1.0 if product.longOrShort.value == LongOrShort.LONG else -1.
 
-    def calculateValue(self) -> None:
+    def pricingInputs(self):
+        """(expiry, tenor, forward, discount factor, accrual factor) of the caplet."""
         expiry_t = accrued(self.valueDate, self.accrualStart)
         tenor_t  = accrued(self.accrualStart, self.accrualEnd)
 
@@ -38,6 +46,18 @@ class ValuationEngineIborCapFloorlet(ValuationEngine):
             self.accrualEnd,
         )
         discount_factor = self.yieldCurve.discountFactor(self.product.index, self.accrualEnd)
+        accrual_factor = accrued(self.accrualStart, self.accrualEnd)
+        return expiry_t, tenor_t, forward_rate, discount_factor, accrual_factor
+
+    def optionInputs(self):
+        """(calculator, index, expiry, tenor, forward, strike, option type, PV per unit of undiscounted price)."""
+        expiry_t, tenor_t, forward_rate, discount_factor, accrual_factor = self.pricingInputs()
+        weight = self.notional * discount_factor * accrual_factor * self.buyOrSell
+        return (self.sabrCalc, self.product.index, np.atleast_1d(expiry_t), np.atleast_1d(tenor_t),
+                np.atleast_1d(forward_rate), np.atleast_1d(self.strikeRate), [self.optionType], np.atleast_1d(weight))
+
+    def calculateValue(self) -> None:
+        expiry_t, tenor_t, forward_rate, discount_factor, accrual_factor = self.pricingInputs()
 
         price = self.sabrCalc.option_price(
             index       = self.product.index,
@@ -48,11 +68,41 @@ class ValuationEngineIborCapFloorlet(ValuationEngine):
             option_type = self.optionType,
         )
 
-        accrual_factor = accrued(self.accrualStart, self.accrualEnd)
         pv = self.notional * discount_factor * accrual_factor * price *  self.buyOrSell
 
         self.value_ = [self.currencyCode, pv]
 
+    def calculateFirstOrderRisk(self, gradient=None, scaler: float = 1.0, accumulate: bool = False) -> None:
+        """
+        PV sensitivities to the forward and to the SABR parameters (see SABRCalculator.option_greeks),
+        plus the curve risk accumulated into the yield curve gradient under the YIELD_CURVE key.
+        """
+        expiry_t, tenor_t, forward_rate, discount_factor, accrual_factor = self.pricingInputs()
+        greeks = self.sabrCalc.option_greeks(
+            index       = self.product.index,
+            expiry      = expiry_t,
+            tenor       = tenor_t,
+            forward     = forward_rate,
+            strike      = self.strikeRate,
+            option_type = self.optionType,
+        )
+        scale = scaler * self.notional * discount_factor * accrual_factor * self.buyOrSell
+        self.firstOrderRisk_ = _pv_greeks(greeks, scale, total=True)
+        self.firstOrderRisk_[SabrModel.MODEL_TYPE] = _bucket_parameter_risk(
+            self, self.product.index, self.sabrCalc.product_type, expiry_t, tenor_t, self.firstOrderRisk_)
+
+        # curve risk: dPV = N acc sign (price dDF + DF dPrice/dF dF), straight into the YC gradient
+        yc = self.yieldCurve
+        gradient = _curve_gradient(yc, gradient, accumulate)
+        index = self.product.index
+        pv_per_df = scaler * self.notional * accrual_factor * self.buyOrSell
+        yc.discountFactorGradientWrtModelParameters(index, self.accrualEnd, gradient, pv_per_df * float(greeks["PRICE"]), accumulate=True)
+        start, term, fwd_accrual = yc.forwardPeriod(index, self.accrualStart, self.accrualEnd)
+        # the YC forward gradient accrues with accrued(); rescale to the index day count used by forward()
+        fwd_scale = accrued(start, term) / fwd_accrual
+        yc.forwardRateGradientWrtModelParameters(index, start, term, gradient, pv_per_df * discount_factor * float(greeks["FORWARD"]) * fwd_scale, accumulate=True)
+        self.firstOrderRisk_[yc.MODEL_TYPE] = np.array(gradient, copy=True)
+
 ValuationEngineRegistry().insert(
     SabrModel.MODEL_TYPE,
     ProductIborCapFloorlet.prodType,
@@ -67,11 +117,13 @@ class ValuationEngineOvernightCapFloorlet(ValuationEngine):
         raw = valuation_parameters.get("SABR_METHOD")
         sabr_method = raw.lower() if isinstance(raw, str) else "" 
         prod_flag   = "CAPLET"   if sabr_method=="top-down" else None
-        self.sabrCalc     = SABRCalculator(
+        # one calculator (and bottom-up correlation surface) per model and index, not per caplet
+        self.sabrCalc     = SABRCalculator.shared(
             model,
-            method  = valuation_parameters.get("SABR_METHOD", None),
-            product = product,
-            product_type = prod_flag 
+            product.index,
+            method       = valuation_parameters.get("SABR_METHOD", None),
+            product_type = prod_flag,
+            kernel       = valuation_parameters.get("SABR_KERNEL", DEFAULT_SABR_KERNEL)
         )
         self.currencyCode = product.currency.value.code()
         self.accrualStart = product.effectiveDate
@@ -81,8 +133,9 @@ class ValuationEngineOvernightCapFloorlet(ValuationEngine):
         self.notional     = product.notional
         self.buyOrSell    = 1.0 if product.longOrShort.value == LongOrShort.LONG else -1.
 
-    def calculateValue(self) -> None:
-        expiry_t = accrued(self.valueDate, self.accrualStart)        
+    def pricingInputs(self):
+        """(expiry, tenor, forward, discount factor, accrual factor) of the caplet."""
+        expiry_t = accrued(self.valueDate, self.accrualStart)
         tenor_t  = accrued(self.accrualStart, self.accrualEnd)
 
         forward_rate    = self.yieldCurve.forward(
@@ -91,6 +144,18 @@ class ValuationEngineOvernightCapFloorlet(ValuationEngine):
             self.accrualEnd,
         )
         discount_factor = self.yieldCurve.discountFactor(self.product.index, self.accrualEnd)
+        accrual_factor = accrued(self.accrualStart, self.accrualEnd)
+        return expiry_t, tenor_t, forward_rate, discount_factor, accrual_factor
+
+    def optionInputs(self):
+        """(calculator, index, expiry, tenor, forward, strike, option type, PV per unit of undiscounted price)."""
+        expiry_t, tenor_t, forward_rate, discount_factor, accrual_factor = self.pricingInputs()
+        weight = self.notional * discount_factor * accrual_factor * self.buyOrSell
+        return (self.sabrCalc, self.product.index, np.atleast_1d(expiry_t), np.atleast_1d(tenor_t),
+                np.atleast_1d(forward_rate), np.atleast_1d(self.strikeRate), [self.optionType], np.atleast_1d(weight))
+
+    def calculateValue(self) -> None:
+        expiry_t, tenor_t, forward_rate, discount_factor, accrual_factor = self.pricingInputs()
 
         price = self.sabrCalc.option_price(
             index       = self.product.index,
@@ -99,19 +164,179 @@ class ValuationEngineOvernightCapFloorlet(ValuationEngine):
             forward     = forward_rate,
             strike      = self.strikeRate,
             option_type = self.optionType,
+            product     = self.product,
         )
 
-        accrual_factor = accrued(self.accrualStart, self.accrualEnd)
         pv = self.notional * discount_factor * accrual_factor * price *  self.buyOrSell
 
         self.value_ = [self.currencyCode, pv]
 
+    def calculateFirstOrderRisk(self, gradient=None, scaler: float = 1.0, accumulate: bool = False) -> None:
+        """
+        PV sensitivities to the forward and to the SABR parameters (see SABRCalculator.option_greeks),
+        plus the curve risk accumulated into the yield curve gradient under the YIELD_CURVE key.
+        """
+        expiry_t, tenor_t, forward_rate, discount_factor, accrual_factor = self.pricingInputs()
+        greeks = self.sabrCalc.option_greeks(
+            index       = self.product.index,
+            expiry      = expiry_t,
+            tenor       = tenor_t,
+            forward     = forward_rate,
+            strike      = self.strikeRate,
+            option_type = self.optionType,
+        )
+        scale = scaler * self.notional * discount_factor * accrual_factor * self.buyOrSell
+        self.firstOrderRisk_ = _pv_greeks(greeks, scale, total=True)
+        self.firstOrderRisk_[SabrModel.MODEL_TYPE] = _bucket_parameter_risk(
+            self, self.product.index, self.sabrCalc.product_type, expiry_t, tenor_t, self.firstOrderRisk_)
+
+        # curve risk: dPV = N acc sign (price dDF + DF dPrice/dF dF), straight into the YC gradient
+        yc = self.yieldCurve
+        gradient = _curve_gradient(yc, gradient, accumulate)
+        index = self.product.index
+        pv_per_df = scaler * self.notional * accrual_factor * self.buyOrSell
+        yc.discountFactorGradientWrtModelParameters(index, self.accrualEnd, gradient, pv_per_df * float(greeks["PRICE"]), accumulate=True)
+        start, term, fwd_accrual = yc.forwardPeriod(index, self.accrualStart, self.accrualEnd)
+        # the YC forward gradient accrues with accrued(); rescale to the index day count used by forward()
+        fwd_scale = accrued(start, term) / fwd_accrual
+        yc.forwardRateGradientWrtModelParameters(index, start, term, gradient, pv_per_df * discount_factor * float(greeks["FORWARD"]) * fwd_scale, accumulate=True)
+        self.firstOrderRisk_[yc.MODEL_TYPE] = np.array(gradient, copy=True)
+
 ValuationEngineRegistry().insert(
     SabrModel.MODEL_TYPE,
     ProductOvernightCapFloorlet.prodType,
     ValuationEngineOvernightCapFloorlet
 )
 
+def _curve_gradient(yieldCurve, gradient, accumulate: bool):
+    """Gradient array the curve risk accumulates into, following the YC engines' convention."""
+    if gradient is None:
+        gradient = yieldCurve.gradient_
+        if not accumulate:
+            yieldCurve.clearGradient()
+    return gradient
+
+def _bucket_parameter_risk(engine, index: str, product_type, expiry, tenor, pvGreeks: Dict[str, Any]) -> Dict[str, np.ndarray]:
+    """Per-option SABR parameter risk bucketed onto the model's grid nodes."""
+    expiry, tenor = np.atleast_1d(np.asarray(expiry, dtype=float)), np.atleast_1d(np.asarray(tenor, dtype=float))
+    sens = {p: np.broadcast_to(np.asarray(pvGreeks[p], dtype=float), expiry.shape) for p in SabrModel.PARAMETERS}
+    return engine.model.bucketSensitivities(index, expiry, tenor, sens, product_type=product_type)
+
+def _pv_greeks(greeks: Dict[str, np.ndarray], scale, total: bool) -> Dict[str, Any]:
+    """Option price greeks -> PV sensitivities (FORWARD, NORMALVOL, BETA, NU, RHO), optionally summed."""
+    out = {}
+    for name, value in greeks.items():
+        if name == "PRICE":
+            continue
+        pv = scale * value
+        out[name] = float(np.sum(pv)) if total else pv
+    return out
+
+class _CapletStrip:
+    """
+    Caplet dates of a cap/floor gathered into arrays once, so a revaluation is one batched
+    discount factor call, one SABR lookup and one vectorized option pricing.
+    """
+
+    def __init__(self, engines) -> None:
+        self.engines = engines
+        n = len(engines)
+        self.expiry  = np.empty(n)
+        self.tenor   = np.empty(n)
+        self.accrual = np.empty(n)
+        self.fwdAccrual = np.empty(n)
+        # discount factor times, laid out as [forward start | forward end | payment]
+        self.dfTimes = np.empty(3 * n)
+        for i, e in enumerate(engines):
+            yc = e.yieldCurve
+            start, term, fwd_accrual = yc.forwardPeriod(e.product.index, e.accrualStart, e.accrualEnd)
+            self.expiry[i]  = accrued(e.valueDate, e.accrualStart)
+            self.tenor[i]   = accrued(e.accrualStart, e.accrualEnd)
+            self.accrual[i] = self.tenor[i]
+            self.fwdAccrual[i] = fwd_accrual
+            self.dfTimes[i]         = accrued(e.valueDate, start)
+            self.dfTimes[n + i]     = accrued(e.valueDate, term)
+            self.dfTimes[2 * n + i] = accrued(e.valueDate, e.accrualEnd)
+        self.strike     = np.array([e.strikeRate for e in engines], dtype=float)
+        self.optionType = [e.optionType for e in engines]
+        self.scale      = np.array([e.notional * e.buyOrSell for e in engines], dtype=float)
+        self.forward = self.discountFactor = self.price = self.forwardDelta = None
+
+    def _curve_inputs(self) -> None:
+        n = len(self.engines)
+        index = self.engines[0].product.index
+        dfs = self.engines[0].yieldCurve.discountFactorsAtTimes(index, self.dfTimes)
+        self.forward = (dfs[:n] / dfs[n:2 * n] - 1.0) / self.fwdAccrual
+        self.discountFactor = dfs[2 * n:]
+
+    def price_strip(self, sabrCalc: SABRCalculator) -> np.ndarray:
+        """Per-caplet PVs."""
+        if not self.engines:
+            return np.zeros(0)
+        self._curve_inputs()
+        self.price = sabrCalc.option_prices(
+            index       = self.engines[0].product.index,
+            expiry      = self.expiry,
+            tenor       = self.tenor,
+            forward     = self.forward,
+            strike      = self.strike,
+            option_type = self.optionType,
+        )
+        return self.scale * self.discountFactor * self.accrual * self.price
+
+    def greeks_strip(self, sabrCalc: SABRCalculator, scaler: float = 1.0) -> Dict[str, np.ndarray]:
+        """Per-caplet PV sensitivities to forward and SABR parameters."""
+        if not self.engines:
+            return {name: np.zeros(0) for name in ("FORWARD", "NORMALVOL", "BETA", "NU", "RHO")}
+        self._curve_inputs()
+        greeks = sabrCalc.option_greeks(
+            index       = self.engines[0].product.index,
+            expiry      = self.expiry,
+            tenor       = self.tenor,
+            forward     = self.forward,
+            strike      = self.strike,
+            option_type = self.optionType,
+        )
+        self.price = greeks["PRICE"]
+        self.forwardDelta = greeks["FORWARD"]
+        return _pv_greeks(greeks, scaler * self.scale * self.discountFactor * self.accrual, total=False)
+
+    def curve_risk_strip(self, gradient, scaler: float = 1.0) -> None:
+        """
+        Accumulates the strip's curve risk into gradient with one batched DF gradient call;
+        call after greeks_strip. The forward is (DF_S / DF_E - 1) / fwdAccrual, so
+        dF = (dDF_S - DF_S / DF_E dDF_E) / (DF_E fwdAccrual).
+        """
+        if not self.engines:
+            return
+        n = len(self.engines)
+        dfs = self.engines[0].yieldCurve.discountFactorsAtTimes(self.engines[0].product.index, self.dfTimes)
+        df_s, df_e = dfs[:n], dfs[n:2 * n]
+        pv_per_df = scaler * self.scale * self.accrual
+        fwd_coeff = pv_per_df * self.discountFactor * self.forwardDelta / (df_e * self.fwdAccrual)
+        coeffs = np.concatenate((fwd_coeff, -fwd_coeff * df_s / df_e, pv_per_df * self.price))
+        self.engines[0].yieldCurve.discountFactorsGradientAtTimes(
+            self.engines[0].product.index, self.dfTimes, coeffs, gradient, accumulate=True)
+
+    def option_inputs(self, sabrCalc: SABRCalculator):
+        """Strip counterpart of the caplet engines' optionInputs."""
+        self._curve_inputs()
+        return (sabrCalc, self.engines[0].product.index, self.expiry, self.tenor, self.forward, self.strike,
+                self.optionType, self.scale * self.discountFactor * self.accrual)
+
+    def report(self, capletValues: np.ndarray) -> pd.DataFrame:
+        return pd.DataFrame({
+            "ACCRUAL START": [e.accrualStart.ISO() for e in self.engines],
+            "ACCRUAL END":   [e.accrualEnd.ISO() for e in self.engines],
+            "EXPIRY":        self.expiry,
+            "ACCRUAL":       self.accrual,
+            "STRIKE":        self.strike,
+            "FORWARD":       self.forward,
+            "DISCOUNT FACTOR": self.discountFactor,
+            "PRICE":         self.price,
+            "PV":            capletValues,
+        })
+
 class ValuationEngineIborCapFloor(ValuationEngine):
 
     def __init__(
@@ -124,14 +349,34 @@ class ValuationEngineIborCapFloor(ValuationEngine):
         self.currencyCode = product.currency.value.code()
         self.caplets      = product.capStream
         self.engines = [ValuationEngineIborCapFloorlet(model, valuation_parameters, caplet) for caplet in self.caplets.products]
+        self.stripCalc = SABRCalculator.shared(model, product.index, kernel=valuation_parameters.get("SABR_KERNEL", DEFAULT_SABR_KERNEL))
+        self.strip = _CapletStrip(self.engines)
+        self.capletValues_ = None
+        self.capletRisks_ = None
 
     def calculateValue(self) -> None:
-        total_pv = 0.0
-        for engine in self.engines:
-            engine.calculateValue()
-            _, pv = engine.value_
-            total_pv += pv
-        self.value_ = [self.currencyCode, total_pv]
+        self.capletValues_ = self.strip.price_strip(self.stripCalc)
+        self.value_ = [self.currencyCode, float(np.sum(self.capletValues_))]
+
+    def optionInputs(self):
+        return self.strip.option_inputs(self.stripCalc)
+
+    @property
+    def capletValues(self) -> np.ndarray:
+        return self.capletValues_
+
+    def createCashflowsReport(self) -> pd.DataFrame:
+        return self.strip.report(self.capletValues_)
+
+    def calculateFirstOrderRisk(self, gradient=None, scaler: float = 1.0, accumulate: bool = False) -> None:
+        self.capletRisks_ = self.strip.greeks_strip(self.stripCalc, scaler)
+        self.firstOrderRisk_ = {name: float(np.sum(v)) for name, v in self.capletRisks_.items()}
+        self.firstOrderRisk_[SabrModel.MODEL_TYPE] = _bucket_parameter_risk(
+            self, self.product.index, self.stripCalc.product_type, self.strip.expiry, self.strip.tenor, self.capletRisks_)
+        yc = self.model.subModel
+        gradient = _curve_gradient(yc, gradient, accumulate)
+        self.strip.curve_risk_strip(gradient, scaler)
+        self.firstOrderRisk_[yc.MODEL_TYPE] = np.array(gradient, copy=True)
 
 ValuationEngineRegistry().insert(
     SabrModel.MODEL_TYPE,
@@ -151,14 +396,63 @@ class ValuationEngineOvernightCapFloor(ValuationEngine):
         self.currencyCode = product.currency.value.code()
         self.caplets      = product.capStream
         self.engines = [ ValuationEngineOvernightCapFloorlet(model, valuation_parameters, caplet) for caplet in self.caplets.products]
+        raw = valuation_parameters.get("SABR_METHOD")
+        sabr_method = raw.lower() if isinstance(raw, str) else ""
+        # bottom-up needs each caplet's own fixing schedule, so it stays with the caplet engines
+        self.stripCalc = None
+        if sabr_method != "bottom-up":
+            self.stripCalc = SABRCalculator.shared(
+                model,
+                product.index,
+                method       = sabr_method or None,
+                product_type = "CAPLET" if sabr_method == "top-down" else None,
+                kernel       = valuation_parameters.get("SABR_KERNEL", DEFAULT_SABR_KERNEL)
+            )
+
+        self.strip = _CapletStrip(self.engines)
+        self.capletValues_ = None
+        self.capletRisks_ = None
 
     def calculateValue(self) -> None:
-        total_pv = 0.0
-        for engine in self.engines:
-            engine.calculateValue()
-            _, pv = engine.value_
-            total_pv += pv
-        self.value_ = [self.currencyCode, total_pv]
+        if self.stripCalc is None:
+            pvs = []
+            for engine in self.engines:
+                engine.calculateValue()
+                _, pv = engine.value_
+                pvs.append(pv)
+            self.capletValues_ = np.array(pvs, dtype=float)
+        else:
+            self.capletValues_ = self.strip.price_strip(self.stripCalc)
+        self.value_ = [self.currencyCode, float(np.sum(self.capletValues_))]
+
+    def optionInputs(self):
+        # bottom-up: the caplets' shared calculator
+        return self.strip.option_inputs(self.stripCalc if self.stripCalc is not None else self.engines[0].sabrCalc)
+
+    @property
+    def capletValues(self) -> np.ndarray:
+        return self.capletValues_
+
+    def createCashflowsReport(self) -> pd.DataFrame:
+        if self.stripCalc is None:
+            return pd.DataFrame({
+                "ACCRUAL START": [e.accrualStart.ISO() for e in self.engines],
+                "ACCRUAL END":   [e.accrualEnd.ISO() for e in self.engines],
+                "PV":            self.capletValues_,
+            })
+        return self.strip.report(self.capletValues_)
+
+    def calculateFirstOrderRisk(self, gradient=None, scaler: float = 1.0, accumulate: bool = False) -> None:
+        if self.stripCalc is None:
+            raise NotImplementedError("Analytic SABR greeks are not available for the bottom-up method")
+        self.capletRisks_ = self.strip.greeks_strip(self.stripCalc, scaler)
+        self.firstOrderRisk_ = {name: float(np.sum(v)) for name, v in self.capletRisks_.items()}
+        self.firstOrderRisk_[SabrModel.MODEL_TYPE] = _bucket_parameter_risk(
+            self, self.product.index, self.stripCalc.product_type, self.strip.expiry, self.strip.tenor, self.capletRisks_)
+        yc = self.model.subModel
+        gradient = _curve_gradient(yc, gradient, accumulate)
+        self.strip.curve_risk_strip(gradient, scaler)
+        self.firstOrderRisk_[yc.MODEL_TYPE] = np.array(gradient, copy=True)
 
 ValuationEngineRegistry().insert(
     SabrModel.MODEL_TYPE,
@@ -166,6 +460,29 @@ ValuationEngineRegistry().insert(
     ValuationEngineOvernightCapFloor
 )
 
+# yield curve -> {underlying swap key: (curve stateVersion, forward swap rate, annuity)}
+_SWAP_CACHE: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+
+def _swap_schedule_key(swap) -> tuple:
+    """Identifies an underlying swap by index, position and the dates of every cashflow."""
+    def leg_key(leg):
+        table = leg.cashflows
+        return tuple(zip(table.startSerial.tolist(), table.endSerial.tolist(), table.paymentSerial.tolist()))
+    return (swap.prodType, swap.index, swap.longOrShort.value, leg_key(swap.fixedLeg), leg_key(swap.floatingLeg))
+
+def _underlying_swap_rate_and_annuity(yieldCurve, key: tuple, irEngine):
+    """Forward swap rate and annuity, shared across swaptions on the same schedule until the curve changes."""
+    entries = _SWAP_CACHE.setdefault(yieldCurve, {})
+    version = getattr(yieldCurve, "stateVersion", None)
+    hit = entries.get(key)
+    if hit is not None and version is not None and hit[0] == version:
+        return hit[1], hit[2]
+
+    irEngine.calculateValue()
+    rate, annuity = irEngine.parRateOrSpread(), irEngine.annuity()
+    entries[key] = (version, rate, annuity)
+    return rate, annuity
+
 class ValuationEngineIborSwaption(ValuationEngine):
 
     def __init__(
@@ -184,8 +501,8 @@ class ValuationEngineIborSwaption(ValuationEngine):
                 "forcing standard Hagan SABR.",
                 UserWarning
             )
-        self.sabrCalc = SABRCalculator(model, method=None)
         self.swap          = product.swap
+        self.sabrCalc = SABRCalculator.shared(model, self.swap.index, kernel=valuation_parameters.get("SABR_KERNEL", DEFAULT_SABR_KERNEL))
         self.expiry        = product.expiryDate
         self.notional      = product.notional
         self.buyOrSell     = 1.0 if product.longOrShort.value == LongOrShort.LONG else -1.
@@ -193,16 +510,16 @@ class ValuationEngineIborSwaption(ValuationEngine):
         self.strikeRate    = self.swap.fixedRate
         self.optionType = product.optionType
         self.optionFlag = 'CAP'   if self.optionType == 'PAYER' else 'FLOOR'
+        # underlying swap engine is built once; its rate/annuity are shared through _SWAP_CACHE
+        ir_vp = {"FUNDING INDEX": self.swap.index}
+        self.irEngine = ValuationEngineRegistry().new_valuation_engine(self.yieldCurve, ir_vp, self.swap)
+        self.swapKey  = _swap_schedule_key(self.swap)
 
     def calculateValue(self) -> None:
         t_exp = accrued(self.valueDate, self.expiry)
         t_ten = accrued(self.swap.firstDate, self.swap.lastDate)
 
-        ir_vp = {"FUNDING INDEX": self.swap.index}
-        ir_engine = ValuationEngineRegistry().new_valuation_engine(self.yieldCurve, ir_vp, self.swap)
-        ir_engine.calculateValue()
-        forward_swap_rate = ir_engine.parRate()
-        swap_annuity      = ir_engine.annuity()
+        forward_swap_rate, swap_annuity = _underlying_swap_rate_and_annuity(self.yieldCurve, self.swapKey, self.irEngine)
 
         price = self.sabrCalc.option_price(
             index       = self.swap.index,
@@ -216,6 +533,44 @@ class ValuationEngineIborSwaption(ValuationEngine):
         pv = self.notional * swap_annuity * price *  self.buyOrSell
         self.value_ = [self.currencyCode, pv]
 
+    def optionInputs(self):
+        """(calculator, index, expiry, tenor, forward swap rate, strike, option type, PV per unit of undiscounted price)."""
+        t_exp = accrued(self.valueDate, self.expiry)
+        t_ten = accrued(self.swap.firstDate, self.swap.lastDate)
+        forward_swap_rate, swap_annuity = _underlying_swap_rate_and_annuity(self.yieldCurve, self.swapKey, self.irEngine)
+        return (self.sabrCalc, self.swap.index, np.atleast_1d(t_exp), np.atleast_1d(t_ten), np.atleast_1d(forward_swap_rate),
+                np.atleast_1d(self.strikeRate), [self.optionFlag], np.atleast_1d(self.notional * swap_annuity * self.buyOrSell))
+
+    def calculateFirstOrderRisk(self, gradient=None, scaler: float = 1.0, accumulate: bool = False) -> None:
+        """
+        PV sensitivities to the forward swap rate (annuity held fixed) and to the SABR parameters,
+        plus the curve risk through both underlying legs under the YIELD_CURVE key.
+        """
+        t_exp = accrued(self.valueDate, self.expiry)
+        t_ten = accrued(self.swap.firstDate, self.swap.lastDate)
+        forward_swap_rate, swap_annuity = _underlying_swap_rate_and_annuity(self.yieldCurve, self.swapKey, self.irEngine)
+        greeks = self.sabrCalc.option_greeks(
+            index       = self.swap.index,
+            expiry      = t_exp,
+            tenor       = t_ten,
+            forward     = forward_swap_rate,
+            strike      = self.strikeRate,
+            option_type = self.optionFlag,
+        )
+        self.firstOrderRisk_ = _pv_greeks(greeks, scaler * self.notional * swap_annuity * self.buyOrSell, total=True)
+        self.firstOrderRisk_[SabrModel.MODEL_TYPE] = _bucket_parameter_risk(
+            self, self.swap.index, self.sabrCalc.product_type, t_exp, t_ten, self.firstOrderRisk_)
+
+        # curve risk through the underlying legs: with PV = N A P(S) sign, A = PV_fixed / (K N) and
+        # S = -PV_float / (N A), dPV = sign (P - P' S) / K dPV_fixed - sign P' dPV_float
+        gradient = _curve_gradient(self.yieldCurve, gradient, accumulate)
+        price, dprice = float(greeks["PRICE"]), float(greeks["FORWARD"])
+        fixed_scaler = scaler * self.buyOrSell * (price - dprice * forward_swap_rate) / self.strikeRate
+        float_scaler = -scaler * self.buyOrSell * dprice
+        self.irEngine.legFirstOrderRisk("FIXED", gradient=gradient, scaler=fixed_scaler)
+        self.irEngine.legFirstOrderRisk("FLOATING", gradient=gradient, scaler=float_scaler)
+        self.firstOrderRisk_[self.yieldCurve.MODEL_TYPE] = np.array(gradient, copy=True)
+
 ValuationEngineRegistry().insert(
     SabrModel.MODEL_TYPE,
     ProductIborSwaption.prodType,
@@ -235,8 +590,8 @@ class ValuationEngineOvernightSwaption(ValuationEngine):
                 "forcing standard Hagan SABR.",
                 UserWarning
             )
-        self.sabrCalc = SABRCalculator(model, method=None)
         self.swap          = product.swap
+        self.sabrCalc = SABRCalculator.shared(model, self.swap.index, kernel=valuation_parameters.get("SABR_KERNEL", DEFAULT_SABR_KERNEL))
         self.expiry        = product.expiryDate
         self.notional      = product.notional
         self.buyOrSell     = 1.0 if product.longOrShort.value == LongOrShort.LONG else -1.
@@ -244,16 +599,16 @@ class ValuationEngineOvernightSwaption(ValuationEngine):
         self.strikeRate    = self.swap.fixedRate
         self.optionType = product.optionType
         self.optionFlag = 'CAP'   if self.optionType == 'PAYER' else 'FLOOR'
+        # underlying swap engine is built once; its rate/annuity are shared through _SWAP_CACHE
+        ir_vp = {"FUNDING INDEX": self.swap.index}
+        self.irEngine = ValuationEngineRegistry().new_valuation_engine(self.yieldCurve, ir_vp, self.swap)
+        self.swapKey  = _swap_schedule_key(self.swap)
 
     def calculateValue(self) -> None:
         t_exp = accrued(self.valueDate, self.expiry)
         t_ten = accrued(self.swap.firstDate, self.swap.lastDate)
 
-        ir_vp = {"FUNDING INDEX": self.swap.index}
-        ir_engine = ValuationEngineRegistry().new_valuation_engine(self.yieldCurve, ir_vp, self.swap)
-        ir_engine.calculateValue()
-        forward_swap_rate = ir_engine.parRate()
-        swap_annuity      = ir_engine.annuity()
+        forward_swap_rate, swap_annuity = _underlying_swap_rate_and_annuity(self.yieldCurve, self.swapKey, self.irEngine)
 
         price = self.sabrCalc.option_price(
             index       = self.swap.index,
@@ -267,6 +622,44 @@ class ValuationEngineOvernightSwaption(ValuationEngine):
         pv = self.notional * swap_annuity * price * self.buyOrSell
         self.value_ = [self.currencyCode, pv]
 
+    def optionInputs(self):
+        """(calculator, index, expiry, tenor, forward swap rate, strike, option type, PV per unit of undiscounted price)."""
+        t_exp = accrued(self.valueDate, self.expiry)
+        t_ten = accrued(self.swap.firstDate, self.swap.lastDate)
+        forward_swap_rate, swap_annuity = _underlying_swap_rate_and_annuity(self.yieldCurve, self.swapKey, self.irEngine)
+        return (self.sabrCalc, self.swap.index, np.atleast_1d(t_exp), np.atleast_1d(t_ten), np.atleast_1d(forward_swap_rate),
+                np.atleast_1d(self.strikeRate), [self.optionFlag], np.atleast_1d(self.notional * swap_annuity * self.buyOrSell))
+
+    def calculateFirstOrderRisk(self, gradient=None, scaler: float = 1.0, accumulate: bool = False) -> None:
+        """
+        PV sensitivities to the forward swap rate (annuity held fixed) and to the SABR parameters,
+        plus the curve risk through both underlying legs under the YIELD_CURVE key.
+        """
+        t_exp = accrued(self.valueDate, self.expiry)
+        t_ten = accrued(self.swap.firstDate, self.swap.lastDate)
+        forward_swap_rate, swap_annuity = _underlying_swap_rate_and_annuity(self.yieldCurve, self.swapKey, self.irEngine)
+        greeks = self.sabrCalc.option_greeks(
+            index       = self.swap.index,
+            expiry      = t_exp,
+            tenor       = t_ten,
+            forward     = forward_swap_rate,
+            strike      = self.strikeRate,
+            option_type = self.optionFlag,
+        )
+        self.firstOrderRisk_ = _pv_greeks(greeks, scaler * self.notional * swap_annuity * self.buyOrSell, total=True)
+        self.firstOrderRisk_[SabrModel.MODEL_TYPE] = _bucket_parameter_risk(
+            self, self.swap.index, self.sabrCalc.product_type, t_exp, t_ten, self.firstOrderRisk_)
+
+        # curve risk through the underlying legs: with PV = N A P(S) sign, A = PV_fixed / (K N) and
+        # S = -PV_float / (N A), dPV = sign (P - P' S) / K dPV_fixed - sign P' dPV_float
+        gradient = _curve_gradient(self.yieldCurve, gradient, accumulate)
+        price, dprice = float(greeks["PRICE"]), float(greeks["FORWARD"])
+        fixed_scaler = scaler * self.buyOrSell * (price - dprice * forward_swap_rate) / self.strikeRate
+        float_scaler = -scaler * self.buyOrSell * dprice
+        self.irEngine.legFirstOrderRisk("FIXED", gradient=gradient, scaler=fixed_scaler)
+        self.irEngine.legFirstOrderRisk("FLOATING", gradient=gradient, scaler=float_scaler)
+        self.firstOrderRisk_[self.yieldCurve.MODEL_TYPE] = np.array(gradient, copy=True)
+
 ValuationEngineRegistry().insert(
     SabrModel.MODEL_TYPE,
     ProductOvernightSwaption.prodType,
@@ -1,3 +1,3 @@
 from fixedincomelib.utilities.numerics import (Interpolator1D, Interpolator2D)
 from fixedincomelib.utilities.optimization import (simple_solver)
-from fixedincomelib.utilities.risk_reporting import (createValueReport)
\ No newline at end of file
+from fixedincomelib.utilities.risk_reporting import (createValueReport, createBucketedVegaReport, createMonteCarloValidationReport)
\ No newline at end of file
@@ -1,3 +1,4 @@
+import bisect
 import numpy as np
 
 ### 1D Interpolator (only support PIECEWISE_CONSTANT) for now
@@ -26,6 +27,11 @@ class Interpolator1D(object):
         return self.values[-1]
     
     def integral(self, start, end):
+        if np.ndim(start) > 0 or np.ndim(end) > 0:
+            # arrays: one pass through the sparse weights
+            indices, weights = self.integral_weights(start, end)
+            return np.sum(np.asarray(self.values, dtype=float)[indices] * weights, axis=-1)
+
         assert start <= end
         
         # find starting and end index
@@ -52,6 +58,44 @@ class Interpolator1D(object):
         
         return runningSum
 
+    def weights(self, time):
+        """
+        Sparse form of interpolate: returns (indices, weights) with
+        interpolate(t) == sum(values[indices] * weights) along the last axis.
+        Accepts a scalar or an array of times.
+        """
+        axis = np.asarray(self.axis, dtype=float)
+        t = np.asarray(time, dtype=float)
+        idx = np.minimum(np.searchsorted(axis, t, side='right'), len(axis) - 1)
+        return idx[..., None], np.ones(idx.shape + (1,), dtype=float)
+
+    def integral_weights(self, start, end):
+        """
+        Sparse form of integral: returns (indices, weights) with
+        integral(a, b) == sum(values[indices] * weights) along the last axis.
+        Weights are the overlaps of [a, b] with each pwc block; only the contiguous
+        run of touched blocks is returned (padded with zero weights for arrays).
+        """
+        axis = np.asarray(self.axis, dtype=float)
+        n = len(axis)
+        a = np.asarray(start, dtype=float)
+        b = np.asarray(end, dtype=float)
+        assert np.all(a <= b)
+
+        # block i holds values[i] on [lower[i], upper[i]) (flat extrapolation at both ends)
+        lower = np.concatenate(([-np.inf], axis[:-1]))
+        upper = np.concatenate((axis[:-1], [np.inf]))
+
+        startIdx = np.minimum(np.searchsorted(axis, a, side='right'), n - 1)
+        endIdx = np.minimum(np.searchsorted(axis, b, side='right'), n - 1)
+        span = int(np.max(endIdx - startIdx)) + 1 if startIdx.size else 1
+
+        offsets = np.arange(span)
+        idx = np.minimum(startIdx[..., None] + offsets, n - 1)
+        overlap = np.minimum(b[..., None], upper[idx]) - np.maximum(a[..., None], lower[idx])
+        active = offsets <= (endIdx - startIdx)[..., None]
+        return idx, np.where(active, np.maximum(overlap, 0.0), 0.0)
+
 class Interpolator2D(object):
 
     def __init__(
@@ -59,44 +103,84 @@ class Interpolator2D(object):
             axis1: np.ndarray, 
             axis2: np.ndarray, 
             values: np.ndarray, 
-            method: str):
+            method: str,
+            memo: bool = False):
         self.method = method
         self.axis1 = axis1
         self.axis2 = axis2
         self.values = values
         assert method == "LINEAR", 'Only LINEAR Supported'
         assert axis1.ndim == 1 and axis2.ndim == 1
-        assert values.shape == (len(axis1), len(axis2))
-
-    def interpolate(self, x: float, y: float) -> float:
-
-        x = min(max(x, self.axis1[0]), self.axis1[-1])
-        y = min(max(y, self.axis2[0]), self.axis2[-1])
-
-        # --- find surrounding indices ---
-        i = np.searchsorted(self.axis1, x) - 1
-        j = np.searchsorted(self.axis2, y) - 1
-        # handle exact right edge
-        if i == len(self.axis1) - 1:
-            i -= 1
-        if j == len(self.axis2) - 1:
-            j -= 1
-
-        x1, x2 = self.axis1[i], self.axis1[i+1]
-        y1, y2 = self.axis2[j], self.axis2[j+1]
-        Q11 = self.values[i,   j]
-        Q21 = self.values[i+1, j]
-        Q12 = self.values[i,   j+1]
-        Q22 = self.values[i+1, j+1]
-
-        if x2 == x1 and y2 == y1:
-            return Q11
-        elif x2 == x1:
-            # linear in y
-            return Q11 + (Q12 - Q11) * (y - y1)/(y2 - y1)
-        elif y2 == y1:
-            # linear in x
-            return Q11 + (Q21 - Q11) * (x - x1)/(x2 - x1)
-
-        # --- bilinear interpolation formula ---
-        return (Q11 * (x2 - x) * (y2 - y) + Q21 * (x - x1) * (y2 - y) + Q12 * (x2 - x) * (y - y1) + Q22 * (x - x1) * (y - y1)) / ((x2 - x1) * (y2 - y1))
\ No newline at end of file
+        # values may carry trailing dimensions, e.g. (n1, n2, k) to interpolate k stacked grids at once
+        assert values.shape[:2] == (len(axis1), len(axis2))
+        # memo of the last scalar bracket per axis: [axis1, axis2] -> (x, bracket)
+        self.memo = memo
+        self._lastBracket = [None, None]
+        self._axisLists = (axis1.tolist(), axis2.tolist())
+
+    def interpolate(self, x, y):
+        """Bilinear interpolation with flat extrapolation; x and y may be scalars or arrays."""
+        if np.ndim(x) == 0 and np.ndim(y) == 0:
+            # scalar fast path: no temporary arrays
+            i0, i1, tx = self._axisBracket(0, x)
+            j0, j1, ty = self._axisBracket(1, y)
+            v = self.values
+            result = ((1.0 - tx) * (1.0 - ty) * v[i0, j0] + tx * (1.0 - ty) * v[i1, j0]
+                      + (1.0 - tx) * ty * v[i0, j1] + tx * ty * v[i1, j1])
+            return float(result) if self.values.ndim == 2 else result
+        indices, weights = self.weights(x, y)
+        trailing = self.values.shape[2:]
+        flat = self.values.reshape((-1,) + trailing)
+        return np.sum(flat[indices] * weights.reshape(weights.shape + (1,) * len(trailing)), axis=weights.ndim - 1)
+
+    def weights(self, x, y):
+        """
+        Bilinear weights: returns (indices, weights), both of shape (..., 4), where
+        indices point into the flattened (axis1 x axis2) grid and
+        interpolate(x, y) == sum(values.ravel()[indices] * weights) for a 2D grid.
+        Accepts scalars or broadcastable arrays of (x, y).
+        """
+        xs, ys = np.broadcast_arrays(np.asarray(x, dtype=float), np.asarray(y, dtype=float))
+        i0, i1, tx = self._axisBracket(0, xs)
+        j0, j1, ty = self._axisBracket(1, ys)
+
+        n2 = len(self.axis2)
+        indices = np.stack(np.broadcast_arrays(i0 * n2 + j0, i1 * n2 + j0, i0 * n2 + j1, i1 * n2 + j1), axis=-1)
+        weights = np.stack(np.broadcast_arrays((1.0 - tx) * (1.0 - ty), tx * (1.0 - ty), (1.0 - tx) * ty, tx * ty), axis=-1)
+        return indices, weights
+
+    def _axisBracket(self, which: int, x):
+        if np.ndim(x) > 0:
+            return _bracket(self.axis1 if which == 0 else self.axis2, x)
+        x = float(x)
+        if self.memo:
+            last = self._lastBracket[which]
+            if last is not None and last[0] == x:
+                return last[1]
+        bracket = _bracket_scalar(self._axisLists[which], x)
+        if self.memo:
+            self._lastBracket[which] = (x, bracket)
+        return bracket
+
+def _bracket_scalar(axis: list, x: float):
+    """Scalar version of _bracket on a python list."""
+    n = len(axis)
+    if n == 1:
+        return 0, 0, 0.0
+    x = min(max(x, axis[0]), axis[-1])
+    lo = min(max(bisect.bisect_right(axis, x) - 1, 0), n - 2)
+    width = axis[lo + 1] - axis[lo]
+    return lo, lo + 1, ((x - axis[lo]) / width if width > 0.0 else 0.0)
+
+def _bracket(axis: np.ndarray, x: np.ndarray):
+    """Lower/upper node indices and linear weight of x on axis, with flat extrapolation."""
+    n = len(axis)
+    xc = np.clip(x, axis[0], axis[-1])
+    if n == 1:
+        zeros = np.zeros(xc.shape, dtype=int)
+        return zeros, zeros, np.zeros(xc.shape, dtype=float)
+    lo = np.clip(np.searchsorted(axis, xc, side='right') - 1, 0, n - 2)
+    hi = lo + 1
+    width = axis[hi] - axis[lo]
+    t = np.where(width > 0.0, (xc - axis[lo]) / np.where(width > 0.0, width, 1.0), 0.0)
+    return lo, hi, t
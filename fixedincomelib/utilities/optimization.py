@@ -1,4 +1,5 @@
 from typing import Callable
+import numpy as np
 
 def simple_solver(
     residual_fn: Callable[[float], float],
@@ -8,13 +9,16 @@ def simple_solver(
     max_iter: int = 50,
 ) -> float:
 
+    if np.ndim(x_prev) > 0 or np.ndim(x_curr) > 0:
+        return _simple_solver_array(residual_fn, x_prev, x_curr, tolerance, max_iter)
+
     f_prev = float(residual_fn(x_prev))
     f_curr = float(residual_fn(x_curr))
 
     for iteration in range(max_iter):
         slope_est = (f_curr - f_prev)
         if slope_est == 0.0:
-            slope_est = 1e-18  
+            slope_est = 1e-18
         x_next = x_curr - f_curr * (x_curr - x_prev) / slope_est
 
         if abs(x_next - x_curr) <= tolerance * (1.0 + abs(x_curr)):
@@ -24,3 +28,25 @@ def simple_solver(
         x_curr, f_curr = x_next, float(residual_fn(x_next))
 
     return float(x_curr)
+
+def _simple_solver_array(residual_fn, x_prev, x_curr, tolerance, max_iter) -> np.ndarray:
+    """
+    Array mode of simple_solver: independent secant iterations on every element, with
+    residual_fn evaluated once per iteration on the whole array. Converged elements are frozen.
+    """
+    x_prev, x_curr = (np.array(x, dtype=float) for x in np.broadcast_arrays(x_prev, x_curr))
+    f_prev = np.asarray(residual_fn(x_prev), dtype=float)
+    f_curr = np.asarray(residual_fn(x_curr), dtype=float)
+    done = np.zeros(x_curr.shape, dtype=bool)
+
+    for iteration in range(max_iter):
+        slope_est = np.where(f_curr - f_prev == 0.0, 1e-18, f_curr - f_prev)
+        x_next = np.where(done, x_curr, x_curr - f_curr * (x_curr - x_prev) / slope_est)
+        done |= np.abs(x_next - x_curr) <= tolerance * (1.0 + np.abs(x_curr))
+        if np.all(done):
+            return x_next
+
+        x_prev, f_prev = x_curr, f_curr
+        x_curr, f_curr = x_next, np.asarray(residual_fn(x_next), dtype=float)
+
+    return x_curr
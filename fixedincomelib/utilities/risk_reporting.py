@@ -1,5 +1,6 @@
 from __future__ import annotations
 import numpy as np
+import pandas as pd
 from fixedincomelib.valuation import ValuationEngineRegistry
 np.set_printoptions(suppress=True)
 np.set_printoptions(precision=8)  
@@ -23,11 +24,86 @@ def createValueReport(valuation_parameters, model, product, request="all"):
         Here the risk is per PV unit - not per quote unit
         """
         ve.calculateFirstOrderRisk()
-        firstOrderrisk = np.asarray(ve.firstOrderRisk_, dtype=float)
-        jacobian = np.asarray(model.jacobian(), dtype=float)
-        risk = np.linalg.solve(jacobian.T, firstOrderrisk)
+        if isinstance(ve.firstOrderRisk_, dict):
+            # SABR engines: the curve block goes through the yield curve sub-model's jacobian,
+            # the SABR parameter sensitivities are passed through
+            curve = model.subModel
+            risk = dict(ve.firstOrderRisk_)
+            jacobian = np.asarray(curve.jacobian(), dtype=float)
+            risk[curve.MODEL_TYPE] = np.linalg.solve(jacobian.T, np.asarray(risk[curve.MODEL_TYPE], dtype=float))
+        else:
+            firstOrderrisk = np.asarray(ve.firstOrderRisk_, dtype=float)
+            jacobian = np.asarray(model.jacobian(), dtype=float)
+            risk = np.linalg.solve(jacobian.T, firstOrderrisk)
         if request == "firstOrderRisk":
             return risk
         return {"pv": pv, "risk": risk}
     
     raise ValueError("request must be one of: 'value', 'firstOrderRisk', 'all'")
+
+def _groupOptionInputs(valuation_parameters, model, products):
+    """
+    Options of every product (see the SABR engines' optionInputs) gathered per shared calculator
+    and index. Returns a list of (calculator, index, position in products, expiry, tenor, forward,
+    strike, option type, PV per unit of undiscounted price), one concatenated array each.
+    """
+    groups = {}
+    for position, product in enumerate(products):
+        ve = ValuationEngineRegistry().new_valuation_engine(model, valuation_parameters, product)
+        calc, index, expiry, tenor, forward, strike, option_type, weight = ve.optionInputs()
+        group = groups.setdefault((id(calc), index), (calc, index, []))
+        group[2].append((np.full(len(expiry), position), expiry, tenor, forward, strike, np.array(option_type, dtype=object), weight))
+    return [(calc, index, *(np.concatenate(column) for column in zip(*rows))) for calc, index, rows in groups.values()]
+
+def createBucketedVegaReport(valuation_parameters, model, products):
+    """
+    SABR parameter risk of a portfolio per (expiry, tenor) node of the model's Data2D grids.
+    The options of every product are gathered per shared calculator and index, their greeks taken
+    with one option_greeks call per group and bucketed with the bilinear interpolation weights;
+    no curve risk is computed.
+    Returns {component name: DataFrame (rows = expiry axis, columns = tenor axis)}.
+    """
+    buckets = {}
+    for calc, index, _, expiry, tenor, forward, strike, option_type, weight in _groupOptionInputs(valuation_parameters, model, products):
+        greeks = calc.option_greeks(
+            index       = index,
+            expiry      = expiry,
+            tenor       = tenor,
+            forward     = forward,
+            strike      = strike,
+            option_type = option_type,
+        )
+        model.bucketSensitivities(
+            index,
+            expiry,
+            tenor,
+            {p: weight * greeks[p] for p in model.PARAMETERS},
+            product_type=calc.product_type,
+            buckets=buckets,
+        )
+
+    report = {}
+    for name, nodes in buckets.items():
+        comp = model.retrieveComponent(name)
+        report[name] = pd.DataFrame(nodes, index=comp.axis1, columns=comp.axis2)
+    return report
+
+def createMonteCarloValidationReport(valuation_parameters, model, products, monteCarlo):
+    """
+    Closed form SABR prices of a portfolio's options (caplets of caps, swaptions) against a
+    Monte Carlo pricer (e.g. analytics.sabr_monte_carlo.SabrMonteCarlo) on the same parameters.
+    Options sharing a calculator and index are simulated in one batch.
+    Returns one row per option: PRODUCT (position in products), the option inputs, the
+    undiscounted CALCULATOR / MONTE CARLO prices with STD ERROR, ERROR and ERROR / STD ERROR,
+    and the same at PV level (PV CALCULATOR, PV MONTE CARLO, PV STD ERROR).
+    """
+    reports = []
+    for calc, index, position, expiry, tenor, forward, strike, option_type, weight in _groupOptionInputs(valuation_parameters, model, products):
+        report = monteCarlo.validate(calc, index, expiry, tenor, forward, strike, option_type)
+        report.insert(0, "PRODUCT", position)
+        report.insert(1, "INDEX", index)
+        report["PV CALCULATOR"] = weight * report["CALCULATOR"]
+        report["PV MONTE CARLO"] = weight * report["MONTE CARLO"]
+        report["PV STD ERROR"] = np.abs(weight) * report["STD ERROR"]
+        reports.append(report)
+    return pd.concat(reports, ignore_index=True).sort_values("PRODUCT", kind="stable", ignore_index=True)
@@ -1,3 +1,3 @@
 from fixedincomelib.yield_curve.yield_curve_model import YieldCurve
 from fixedincomelib.yield_curve.pillar_node import PillarNode
-from fixedincomelib.yield_curve.valuation_engine_yc import (ValuationEngineProductBulletCashflow, ValuationEngineProductFuture, ValuationEngineProductRfrFuture, ValuationEngineInterestRateStream, ValuationEngineProductIborCashflow, ValuationEngineProductOvernightIndexCashflow, ValuationEngineProductPortfolio, ValuationEngineRegistry)
\ No newline at end of file
+from fixedincomelib.yield_curve.valuation_engine_yc import (ValuationEngineProductBulletCashflow, ValuationEngineProductFuture, ValuationEngineProductRfrFuture, ValuationEngineInterestRateStream, ValuationEngineInterestRateStreamLeg, ValuationEngineProductIborCashflow, ValuationEngineProductOvernightIndexCashflow, ValuationEngineProductPortfolio, ValuationEngineRegistry)
\ No newline at end of file
@@ -3,8 +3,9 @@ import numpy as np
 import pandas as pd
 from fixedincomelib.yield_curve.yield_curve_model import YieldCurve
 from fixedincomelib.product import (LongOrShort, ProductIborCashflow, ProductBulletCashflow, ProductFuture, ProductRfrFuture,ProductIborSwap,ProductOvernightSwap,
-                        ProductOvernightIndexCashflow, ProductPortfolio)
+                        ProductOvernightIndexCashflow, ProductPortfolio, InterestRateStream)
 from fixedincomelib.valuation import (ValuationEngine, ValuationEngineRegistry, IndexManager)
+from fixedincomelib.date import Date
 from fixedincomelib.date.utilities import accrued
 
 class ValuationEngineProductBulletCashflow(ValuationEngine):
@@ -208,7 +209,9 @@ class ValuationEngineProductOvernightIndexCashflow(ValuationEngine):
             compounding_parameter = (float(compoundFactor) * accrual_stub) if is_compound else accrual_stub
             dFactor = float(self.model.discountFactor(self.funding_index, pay_date))
 
-            forward_scaler = float(scaler) * dFactor * self.direction * self.notional * compounding_parameter
+            # forwardRateGradientWrtModelParameters accrues with accrued(); forward() uses the index day count
+            _, _, index_accrual = self.model.forwardPeriod(self.index_name, stub_start, self.termination_date)
+            forward_scaler = float(scaler) * dFactor * self.direction * self.notional * compounding_parameter * accrual_stub / index_accrual
             self.model.forwardRateGradientWrtModelParameters(index= self.index_name,
                                                              start_time = stub_start,
                                                              end_time = self.termination_date,
@@ -407,6 +410,112 @@ ValuationEngineRegistry().insert(
     ValuationEngineProductPortfolio
 )
 
+class ValuationEngineInterestRateStreamLeg(ValuationEngine):
+    """
+    Values an InterestRateStream straight from its CashflowTable: one batched discount factor call
+    for payments and forward periods instead of one child engine per cashflow. Floating amounts
+    follow the cashflow engines (spreads are not applied); value_ is the leg PV discounted on the
+    funding index. Overnight cashflows that started before the valuation date need fixings, so
+    only those are materialized and valued by their own engines.
+    """
+
+    def __init__(self, model: YieldCurve, valuation_parameters: dict, product: InterestRateStream):
+        super().__init__(model, valuation_parameters, product)
+        table = product.cashflows
+        self.table = table
+        self.currency = table.currency
+        self.funding_index = valuation_parameters["FUNDING INDEX"]
+        self.direction = 1.0 if LongOrShort(table.position).value == LongOrShort.LONG else -1.0
+        valueDate = model.valueDate
+        valuation_date = valuation_parameters.get("valuation_date", valueDate)
+        to_time = lambda serial: accrued(valueDate, Date(int(serial)))
+        self.payTimes = np.array([to_time(x) for x in table.paymentSerial])
+
+        # forward periods as forward() sees them: (start, end) times and the index accrual
+        self.live = np.arange(len(table))
+        self._seasoned = []
+        if table.kind == "OVERNIGHT":
+            seasoned = table.startSerial < valuation_date.serialNumber()
+            self.live = np.flatnonzero(~seasoned)
+            self._seasoned = [
+                (i, ValuationEngineRegistry().new_valuation_engine(model, valuation_parameters, product.element(i)))
+                for i in np.flatnonzero(seasoned)]
+        n = len(self.live)
+        self.fwdTimes = np.empty(2 * n)
+        self.fwdAccrual = np.empty(n)
+        # the curve risk of the cashflow engines differentiates the forward over the accrual period
+        self.riskTimes = np.empty(2 * n)
+        if table.kind != "FIXED":
+            for j, i in enumerate(self.live):
+                start, end = Date(int(table.startSerial[i])), Date(int(table.endSerial[i]))
+                fwd_start, fwd_end, self.fwdAccrual[j] = model.forwardPeriod(table.index, start, end)
+                self.fwdTimes[j], self.fwdTimes[n + j] = accrued(valueDate, fwd_start), accrued(valueDate, fwd_end)
+                self.riskTimes[j], self.riskTimes[n + j] = accrued(valueDate, start), accrued(valueDate, end)
+        self.discountFactors = None
+        self.forwards = None
+
+    def cashflowValues(self) -> np.ndarray:
+        """Undiscounted signed amounts per cashflow, as the cashflow engines value them."""
+        table = self.table
+        scale = self.direction * table.notional
+        if table.kind == "FIXED":
+            return self.direction * table.amount
+        n = len(self.live)
+        dfs = self.model.discountFactorsAtTimes(table.index, self.fwdTimes)
+        self.forwards = (dfs[:n] / dfs[n:] - 1.0) / self.fwdAccrual
+        amounts = np.zeros(len(table))
+        amounts[self.live] = scale[self.live] * self.forwards * table.accrual[self.live]
+        for i, eng in self._seasoned:
+            eng.calculateValue()
+            amounts[i] = eng.value_[1]
+        return amounts
+
+    def calculateValue(self):
+        self.amounts = self.cashflowValues()
+        self.discountFactors = self.model.discountFactorsAtTimes(self.funding_index, self.payTimes)
+        self.value_ = [self.currency, float(np.sum(self.amounts * self.discountFactors))]
+
+    def calculateFirstOrderRisk(self, gradient=None, scaler=1.0, accumulate=False):
+        if gradient is None:
+            gradient = self.model.gradient_
+            if not accumulate:
+                self.model.clearGradient()
+
+        self.calculateValue()
+        table = self.table
+        live = self.live
+        amounts = self.amounts.copy()
+        seasoned = [i for i, _ in self._seasoned]
+        amounts[seasoned] = 0.0
+
+        # dDF term of every live cashflow in one call
+        self.model.discountFactorsGradientAtTimes(self.funding_index, self.payTimes, float(scaler) * amounts, gradient, accumulate=True)
+
+        if table.kind != "FIXED" and len(live):
+            # dF term: F = (DF_S / DF_E - 1) / a over the cashflow's accrual period with a = accrued(start, end),
+            # so dF = (dDF_S - DF_S / DF_E dDF_E) / (DF_E a)
+            n = len(live)
+            df_pay = self.discountFactors[live]
+            fwd_scaler = float(scaler) * df_pay * self.direction * table.notional[live] * table.accrual[live]
+            if table.kind == "OVERNIGHT":
+                # the overnight engines rescale to the index day count used by forward()
+                fwd_scaler = fwd_scaler * table.accrual[live] / self.fwdAccrual
+            dfs = self.model.discountFactorsAtTimes(table.index, self.riskTimes)
+            df_s, df_e = dfs[:n], dfs[n:]
+            fwd_coeff = np.where(table.accrual[live] > 0.0, fwd_scaler / (df_e * table.accrual[live]), 0.0)
+            coeffs = np.concatenate((fwd_coeff, -fwd_coeff * df_s / df_e))
+            self.model.discountFactorsGradientAtTimes(table.index, self.riskTimes, coeffs, gradient, accumulate=True)
+
+        for _, eng in self._seasoned:
+            eng.calculateFirstOrderRisk(gradient=gradient, scaler=scaler, accumulate=True)
+        self.firstOrderRisk_ = self.model.getGradientArray()
+
+ValuationEngineRegistry().insert(
+    YieldCurve.modelType,
+    InterestRateStream.prodType,
+    ValuationEngineInterestRateStreamLeg
+)
+
 class ValuationEngineInterestRateStream(ValuationEngine):
     def __init__(self, model: YieldCurve, valuation_parameters: dict, product):
         super().__init__(model, valuation_parameters, product)
@@ -429,27 +538,8 @@ class ValuationEngineInterestRateStream(ValuationEngine):
         self._fixed_engine.calculateValue()
         ccy_fixed, pv_fixed = self._fixed_engine.value_
 
-        pv_float = 0.0
-        ccy_float = ccy_fixed
-
-        if hasattr(self._float_engine, "_engines"):
-            for eng in self._float_engine._engines:
-                eng.calculateValue()
-                ccy, amt = eng.value_
-                ccy_float = ccy
-
-                prod = eng.product
-                prod_type = getattr(prod, "prodType", "")
-
-                if prod_type in ("ProductOvernightIndexCashflow", "ProductIborCashflow"):
-                    pay_dt = prod.paymentDate_
-                    df = self.model.discountFactor(self.funding_index, pay_dt)
-                    pv_float += amt * df
-                else:
-                    pv_float += amt
-        else:
-            self._float_engine.calculateValue()
-            ccy_float, pv_float = self._float_engine.value_
+        self._float_engine.calculateValue()
+        ccy_float, pv_float = self._float_engine.value_
 
         total = pv_fixed + pv_float
         self._pv_fixed = pv_fixed
@@ -475,21 +565,18 @@ class ValuationEngineInterestRateStream(ValuationEngine):
                 self.model.clearGradient()
         
         #FIXED LEG
-        if hasattr(self._fixed_engine, "_engines"):
-            for eng in self._fixed_engine._engines:
-                eng.calculateFirstOrderRisk(gradient=gradient, scaler=scaler, accumulate=True)
-        else:
-            self._fixed_engine.calculateFirstOrderRisk(gradient=gradient, scaler=scaler, accumulate=True)
+        self.legFirstOrderRisk("FIXED", gradient=gradient, scaler=scaler)
 
         #FLOATING LEG
-        if hasattr(self._float_engine, "_engines"):
-            for eng in self._float_engine._engines:
-                eng.calculateFirstOrderRisk(gradient=gradient, scaler=scaler, accumulate=True)
-        else:
-            self._float_engine.calculateFirstOrderRisk(gradient=gradient, scaler=scaler, accumulate=True)
+        self.legFirstOrderRisk("FLOATING", gradient=gradient, scaler=scaler)
                         
         self.firstOrderRisk_ = self.model.getGradientArray()
 
+    def legFirstOrderRisk(self, leg: str, gradient, scaler=1.0) -> None:
+        """Accumulates scaler * dPV(leg)/dtheta into gradient, leg being 'FIXED' or 'FLOATING'."""
+        engine = self._fixed_engine if leg.upper() == "FIXED" else self._float_engine
+        engine.calculateFirstOrderRisk(gradient=gradient, scaler=scaler, accumulate=True)
+
 
 # register for both IBOR and OIS swaps
 ValuationEngineRegistry().insert(
@@ -512,6 +599,7 @@ _ENGINE_MAP = {
     ProductFuture.prodType:                  ValuationEngineProductFuture,
     ProductRfrFuture.prodType:               ValuationEngineProductRfrFuture,
     ProductPortfolio.prodType:               ValuationEngineProductPortfolio,
+    InterestRateStream.prodType:             ValuationEngineInterestRateStreamLeg,
     ProductIborSwap.prodType:                ValuationEngineInterestRateStream,
     ProductOvernightSwap.prodType:           ValuationEngineInterestRateStream,
 }
@@ -15,7 +15,11 @@ DEFAULT_IFR_GUESS = 0.04
 class YieldCurve(Model):
     MODEL_TYPE = 'YIELD_CURVE'
 
-    def __init__(self, valueDate: str, dataCollection: DataCollection, buildMethodCollection: list) -> None:
+    def __init__(self, valueDate: str, dataCollection: DataCollection, buildMethodCollection: list, calibratedStates: Optional[Dict[str, List[float]]] = None) -> None:
+        # bumped whenever a component installs new state variables; consumers key caches on it
+        self.stateVersion_ = 0
+        # target -> IFR state of an earlier calibration (see calibratedStates()); those components skip the solve
+        self.calibratedStates_ = {str(k).upper(): v for k, v in (calibratedStates or {}).items()}
         super().__init__(valueDate, 'YIELD_CURVE', dataCollection, buildMethodCollection)
         self.gradient_labels_: List[str] = []
         self.gradient_offsets_: np.ndarray = np.zeros(1, dtype=int)
@@ -67,6 +71,13 @@ class YieldCurve(Model):
     def getGradientArray(self) -> np.ndarray:
         return self.gradient_.copy()
     
+    def onComponentChanged(self) -> None:
+        self.stateVersion_ += 1
+
+    @property
+    def stateVersion(self) -> int:
+        return self.stateVersion_
+
     def _target_slice(self, index: str) -> slice:
         key = str(index).upper()
         if key not in self.gradient_slices_:
@@ -74,7 +85,12 @@ class YieldCurve(Model):
         return self.gradient_slices_[key]
 
     def newModelComponent(self, buildMethod: dict):
-        return YieldCurveModelComponent(self.valueDate, self.dataCollection, buildMethod, parent_model=self)
+        stateVars = self.calibratedStates_.get(str(buildMethod['TARGET']).upper())
+        return YieldCurveModelComponent(self.valueDate, self.dataCollection, buildMethod, parent_model=self, stateVars=stateVars)
+
+    def calibratedStates(self) -> Dict[str, List[float]]:
+        """target -> calibrated IFR state variables; plain floats, so they can cross process boundaries."""
+        return {str(comp.target).upper(): comp.state_variables for comp in self._components_in_order()}
     
     def discountFactor(self, index : str, to_date : Union[str, Date]):
         this_component = self.retrieveComponent(index)
@@ -85,6 +101,14 @@ class YieldCurve(Model):
         time = accrued(self.valueDate_, to_date_)
         exponent = this_component.getStateVarInterpolator().integral(0, time)
         return np.exp(-exponent)
+
+    def discountFactorsAtTimes(self, index : str, times) -> np.ndarray:
+        """Discount factors for an array of year fractions from the value date, in one pass."""
+        this_component = self.retrieveComponent(index)
+        times_ = np.asarray(times, dtype=float)
+        assert np.all(times_ >= 0.0)
+        exponent = this_component.getStateVarInterpolator().integral(np.zeros_like(times_), times_)
+        return np.exp(-exponent)
     
     # def gradientDiscountFactor(self, index: str, to_date: Union[str, Date]) -> np.ndarray:
     #     this_component = self.retrieveComponent(index)
@@ -116,25 +140,34 @@ class YieldCurve(Model):
             return self.forwardIborIndex(component.target, effectiveDate)
         
     def forwardIborIndex(self, index : str, effectiveDate : Union[Date, str]):
-        component = self.retrieveComponent(index)
-        liborIndex = component.targetIndex
-        tenor = liborIndex.tenor()
-        # end date
-        cal = liborIndex.fixingCalendar()
-        effectiveDate_ = effectiveDate
-        if isinstance(effectiveDate, str): effectiveDate_ = Date(effectiveDate)
-        termDate = Date(cal.advance(effectiveDate_, tenor, liborIndex.businessDayConvention()))
-        # accrued
-        accrual = liborIndex.dayCounter().yearFraction(effectiveDate_, termDate)
+        effectiveDate_, termDate, accrual = self.forwardPeriod(index, effectiveDate)
         # forward rate
         dfStart = self.discountFactor(index, effectiveDate_)
         dfEnd = self.discountFactor(index, termDate)
         return (dfStart / dfEnd - 1.) / accrual
     
     def forwardOvernightIndex(self, index : str, effectiveDate : Union[Date, str], termOrTerminationDate : Union[str, TermOrTerminationDate, Date]):
+        effectiveDate_, termDate, accrual = self.forwardPeriod(index, effectiveDate, termOrTerminationDate)
+        dfStart = self.discountFactor(index, effectiveDate_)
+        dfEnd   = self.discountFactor(index, termDate)
+        return (dfStart / dfEnd - 1.0) / accrual
+
+    def forwardPeriod(self, index : str, effectiveDate : Union[Date, str], termOrTerminationDate : Optional[Union[str, TermOrTerminationDate, Date]]=''):
+        """
+        (effective date, term date, index accrual) of the period forward() uses for this index.
+        Ibor indices ignore termOrTerminationDate and roll the index tenor.
+        """
         component = self.retrieveComponent(index)
-        oisIndex = component.targetIndex
         effectiveDate_ = effectiveDate if isinstance(effectiveDate, Date) else Date(effectiveDate)
+        if not component.isOvernightIndex:
+            liborIndex = component.targetIndex
+            # end date
+            cal = liborIndex.fixingCalendar()
+            termDate = Date(cal.advance(effectiveDate_, liborIndex.tenor(), liborIndex.businessDayConvention()))
+            # accrued
+            return effectiveDate_, termDate, liborIndex.dayCounter().yearFraction(effectiveDate_, termDate)
+
+        oisIndex = component.targetIndex
         if isinstance(termOrTerminationDate, Date):
             termDate = termOrTerminationDate
         else:
@@ -148,10 +181,7 @@ class YieldCurve(Model):
                 )
             else:
                 termDate = to.getDate()
-        accrual = oisIndex.dayCounter().yearFraction(effectiveDate_, termDate)
-        dfStart = self.discountFactor(index, effectiveDate_)
-        dfEnd   = self.discountFactor(index, termDate)
-        return (dfStart / dfEnd - 1.0) / accrual
+        return effectiveDate_, termDate, oisIndex.dayCounter().yearFraction(effectiveDate_, termDate)
     
     def discountFactorGradientWrtModelParameters(
             self,
@@ -173,23 +203,48 @@ class YieldCurve(Model):
         
         tau = accrued(start_dt=self.valueDate_, end_date=to_dt)
         df = float(self.discountFactor(index=index, to_date=to_dt))
-        pillar_times = np.asarray(comp.pillarsTimeToDate, dtype=float)
 
-        if pillar_times.size:
-            starts   = np.concatenate(([0.0], pillar_times[:-1]))
-            ends     = pillar_times
-            overlap  = np.maximum(0.0, np.minimum(tau, ends) - starts)
-            grad_vec = (-df) * overlap
-        else:
-            grad_vec = np.zeros(0, dtype=float)
-        
         grad = self.gradient_ if gradient is None else gradient
         block = self._target_slice(comp.target)
-        if accumulate:
-            grad[block] += float(scaler) * grad_vec
-        else:
-            grad[block] = float(scaler) * grad_vec
+        if not accumulate:
+            grad[block] = 0.0
+        if len(comp.pillarsTimeToDate) == 0:
+            return
+
+        # d(-log DF)/d theta_k = overlap of [0, tau] with pwc block k
+        idx, overlap = comp.getStateVarInterpolator().integral_weights(0.0, tau)
+        np.add.at(grad[block], idx, float(scaler) * (-df) * overlap)
     
+    def discountFactorsGradientAtTimes(
+            self,
+            index: str,
+            times,
+            scalers,
+            gradient: Optional[np.ndarray] = None,
+            accumulate: bool = False) -> None:
+        """
+        Batched discountFactorGradientWrtModelParameters: adds sum_i scalers[i] * dDF(times[i]) / dtheta,
+        with times as year fractions from the value date.
+        """
+        comp = self.retrieveComponent(index)
+        if comp is None:
+            raise KeyError(f"Unknown component '{index}'")
+        if comp.interpolationMethod_.upper() != "PIECEWISE_CONSTANT":
+            raise NotImplementedError("Only PIECEWISE_CONSTANT IFR gradient is implemented.")
+
+        times_ = np.asarray(times, dtype=float)
+        grad = self.gradient_ if gradient is None else gradient
+        block = self._target_slice(comp.target)
+        if not accumulate:
+            grad[block] = 0.0
+        if len(comp.pillarsTimeToDate) == 0 or times_.size == 0:
+            return
+
+        dfs = self.discountFactorsAtTimes(index, times_)
+        idx, overlap = comp.getStateVarInterpolator().integral_weights(np.zeros_like(times_), times_)
+        weights = (np.asarray(scalers, dtype=float) * (-dfs))[..., None] * overlap
+        np.add.at(grad[block], idx.ravel(), weights.ravel())
+
     def forwardRateGradientWrtModelParameters(
         self,
         index: str,
@@ -213,36 +268,27 @@ class YieldCurve(Model):
             raise AssertionError("start_time/end_time out of order or before value date.") 
         
         accrual = float(accrued(start,end))
-        pillar_times = np.asarray(comp.pillarsTimeToDate, dtype=float)
 
         grad = self.gradient_ if gradient is None else gradient
         block = self._target_slice(comp.target)
-        
-        if accrual <= 0.0 or pillar_times.size == 0:
-            if accumulate:
-                return
-            else:
-                grad[block] = 0.0
-                return
+        if not accumulate:
+            grad[block] = 0.0
+        if accrual <= 0.0 or len(comp.pillarsTimeToDate) == 0:
+            return
 
         df_S = float(self.discountFactor(index, start))
         df_E = float(self.discountFactor(index, end))
 
-        starts = np.concatenate(([0.0], pillar_times[:-1]))
-        ends = pillar_times
         tau_S = accrued(self.valueDate_, start)
         tau_E = accrued(self.valueDate_, end)
-        overlap_S = np.maximum(0.0, np.minimum(tau_S, ends) - starts)
-        overlap_E = np.maximum(0.0, np.minimum(tau_E, ends) - starts)
-        g_S = (-df_S) * overlap_S
-        g_E = (-df_E) * overlap_E
-
-        dF = ((g_S / df_E) - (df_S * g_E) / (df_E * df_E)) / accrual
+        interp = comp.getStateVarInterpolator()
+        idx_S, overlap_S = interp.integral_weights(0.0, tau_S)
+        idx_E, overlap_E = interp.integral_weights(0.0, tau_E)
 
-        if accumulate:
-            grad[block] += float(scaler) * dF
-        else:
-            grad[block] = float(scaler) * dF
+        # F = (DF_S / DF_E - 1) / accrual, with dDF = -DF * overlap
+        ratio = df_S / df_E
+        np.add.at(grad[block], idx_S, float(scaler) * (-ratio / accrual) * overlap_S)
+        np.add.at(grad[block], idx_E, float(scaler) * (ratio / accrual) * overlap_E)
 
     def jacobian(self):
         registry = ValuationEngineRegistry()
@@ -269,7 +315,7 @@ class YieldCurve(Model):
 
 class YieldCurveModelComponent(ModelComponent):
 
-    def __init__(self, valueDate: Date, dataCollection: DataCollection, buildMethod: dict, parent_model=None) -> None:
+    def __init__(self, valueDate: Date, dataCollection: DataCollection, buildMethod: dict, parent_model=None, stateVars: Optional[List[float]] = None) -> None:
         super().__init__(valueDate, dataCollection, buildMethod)
         self._model = parent_model
         self.interpolationMethod_ = self.buildMethod_.get('INTERPOLATION METHOD', 'PIECEWISE_CONSTANT')
@@ -292,9 +338,14 @@ class YieldCurveModelComponent(ModelComponent):
             self._model.components[key] = self
             self._model.components[key.upper()] = self
 
-        self.calibrate()
+        if stateVars is None:
+            self.calibrate()
+        else:
+            self._buildPillars()
+            self.installStateVars(stateVars)
 
-    def calibrate(self):
+    def _buildPillars(self):
+        """Calibration basket, pillars and pillar nodes, with the IFR state at its initial guess."""
         calibration_instruments = build_yc_calibration_basket_from_dc(
             value_date=self.valueDate_,
             data_collection=self.dataCollection,
@@ -336,10 +387,15 @@ class YieldCurveModelComponent(ModelComponent):
                                          end_date= end_date, 
                                          instrument = product,
                                          state_value=float(theta[k])))
-                        
+
+    def calibrate(self):
+        self._buildPillars()
+        theta = np.array(self.stateVars_, dtype=float)
+
         def _install_theta(theta_vec):
             self.stateVars_ = list(map(float, theta_vec))
             self.ifrInterpolator = Interpolator1D(self.pillarsTimeToDate, self.stateVars_, self.interpolationMethod_)
+            self._notifyModel()
 
         valuation_params = {"FUNDING INDEX" : self.target_}
         registry = ValuationEngineRegistry()
@@ -374,6 +430,7 @@ class YieldCurveModelComponent(ModelComponent):
             
         self.stateVars_ = list(theta)
         self.ifrInterpolator = Interpolator1D(self.pillarsTimeToDate, self.stateVars_, self.interpolationMethod_)
+        self._notifyModel()
 
         # def _df_and_grad(d: Date) -> Tuple[float, np.ndarray]:
         #     df = self._model.discountFactor(self.target_, d)
@@ -518,6 +575,16 @@ class YieldCurveModelComponent(ModelComponent):
         # self.stateVars_ = list(theta)
         # self.ifrInterpolator = Interpolator1D(self.pillarsTimeToDate, self.stateVars_, self.interpolationMethod_)
 
+    def installStateVars(self, stateVars: List[float]) -> None:
+        """Installs an already calibrated IFR state (one value per pillar) instead of solving for it."""
+        if len(stateVars) != len(self.pillarsTimeToDate):
+            raise ValueError(f"{self.target_}: {len(stateVars)} state variables for {len(self.pillarsTimeToDate)} pillars")
+        self.stateVars_ = [float(x) for x in stateVars]
+        self.ifrInterpolator = Interpolator1D(self.pillarsTimeToDate, self.stateVars_, self.interpolationMethod_)
+        for node, value in zip(self.nodes, self.stateVars_):
+            node.state_value = value
+        self._notifyModel()
+
     def getStateVarInterpolator(self):
         return self.ifrInterpolator
 
@@ -553,4 +620,9 @@ class YieldCurveModelComponent(ModelComponent):
     def perturbModelParameter(self, state_var_index: int, perturb_size: float) -> None:
         super().perturbModelParameter(state_var_index, perturb_size)
         self.ifrInterpolator = Interpolator1D(self.pillarsTimeToDate, self.stateVars_, self.interpolationMethod_)
-        self.nodes[state_var_index].state_value = float(self.stateVars_[state_var_index])
\ No newline at end of file
+        self.nodes[state_var_index].state_value = float(self.stateVars_[state_var_index])
+        self._notifyModel()
+
+    def _notifyModel(self) -> None:
+        if self._model is not None and hasattr(self._model, "onComponentChanged"):
+            self._model.onComponentChanged()
\ No newline at end of file